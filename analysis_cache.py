@@ -0,0 +1,38 @@
+import os
+import re
+import json
+import hashlib
+
+from parse_cache import ParseCache
+from prompts import PROMPT_VERSION, TRIAGE_PROMPT_VERSION
+
+ANALYSIS_CACHE_DIR = os.path.join("output", "analysis_cache")
+
+
+def normalize_job_description(job_description: str) -> str:
+    return re.sub(r"\s+", " ", job_description).strip()
+
+
+class AnalysisCache(ParseCache):
+    """
+    On-disk cache of analyze_resume_against_job (and triage_resume) results.
+
+    Keyed on a hash of the parsed resume, a hash of the whitespace-normalised job
+    description, the model name and the prompt version of that kind of request.
+    """
+
+    def __init__(self, cache_dir: str = ANALYSIS_CACHE_DIR, max_entries: int = 50000, max_age_days: int = 90):
+        super().__init__(cache_dir=cache_dir, max_entries=max_entries, max_age_days=max_age_days)
+
+    def key_for(self, resume_data: dict, job_description: str, llm, kind: str = "analyze") -> str:
+        model = getattr(llm, "model", type(llm).__name__)
+        resume_hash = hashlib.sha256(json.dumps(resume_data, sort_keys=True).encode("utf-8")).hexdigest()
+        jd_hash = hashlib.sha256(normalize_job_description(job_description).encode("utf-8")).hexdigest()
+        # The token budget decides how much of the resume the prompt carries
+        budget = getattr(llm, "analysis_token_budget", "")
+        raw = f"{resume_hash}|{jd_hash}|{model}|{PROMPT_VERSION}|{budget}"
+        if kind == "triage":
+            model = getattr(llm, "triage_model", model)
+            budget = getattr(llm, "triage_token_budget", "")
+            raw = f"{resume_hash}|{jd_hash}|{model}|triage-{TRIAGE_PROMPT_VERSION}|{budget}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
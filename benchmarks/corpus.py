@@ -0,0 +1,63 @@
+import os
+import random
+
+import fitz  # PyMuPDF for PDF generation
+import pandas as pd
+
+FIRST_NAMES = ["Asha", "Ben", "Chen", "Diego", "Eva", "Farah", "Gita", "Hugo", "Ines", "Jon"]
+LAST_NAMES = ["Rao", "Smith", "Li", "Garcia", "Novak", "Khan", "Patel", "Martin", "Silva", "Berg"]
+SKILLS = [
+    "Python", "Java", "Go", "Kubernetes", "Docker", "AWS", "GCP", "SQL", "React", "Node.js",
+    "Terraform", "Spark", "Kafka", "PyTorch", "TensorFlow", "Linux", "C++", "Rust", "Airflow", "dbt",
+]
+VERBS = ["Led", "Built", "Designed", "Migrated", "Optimised", "Maintained", "Shipped", "Automated"]
+
+
+def _resume_lines(rng: random.Random, name: str, pages: int) -> list:
+    lines = [name, f"{name.split()[0].lower()}@example.com | +1 415 555 {rng.randint(1000, 9999)}", "", "Skills"]
+    lines.append(", ".join(rng.sample(SKILLS, 6)))
+    lines += ["", "Experience"]
+    for _ in range(12 * pages):
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(SKILLS)} services, improving throughput by {rng.randint(5, 80)}%")
+    lines += ["", "Education", "B.Sc. Computer Science"]
+    return lines
+
+
+def write_resume_pdf(path: str, lines: list, lines_per_page: int = 45):
+    doc = fitz.open()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        y = 60
+        for line in lines[start:start + lines_per_page]:
+            page.insert_text((50, y), line, fontsize=10)
+            y += 16
+    doc.save(path)
+    doc.close()
+
+
+def generate_corpus(out_dir: str, n_resumes: int, max_pages: int = 3, seed: int = 0) -> dict:
+    """
+    Write n synthetic resume PDFs plus matching candidate/attachment CSVs.
+
+    Returns the resume folder and CSV paths in the shape main.py expects.
+    """
+    rng = random.Random(seed)
+    resume_dir = os.path.join(out_dir, "resumes")
+    os.makedirs(resume_dir, exist_ok=True)
+
+    candidates, attachments = [], []
+    for i in range(n_resumes):
+        app_id = f"APP{i:06d}"
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        file_name = f"resume_{i:06d}.pdf"
+        path = os.path.join(resume_dir, file_name)
+        if not os.path.exists(path):
+            write_resume_pdf(path, _resume_lines(rng, name, rng.randint(1, max_pages)))
+        candidates.append({"Application Id": app_id, "Full Name": name})
+        attachments.append({"Parent Id": app_id, "File Name": file_name})
+
+    candidate_csv = os.path.join(out_dir, "candidates.csv")
+    attachment_csv = os.path.join(out_dir, "attachments.csv")
+    pd.DataFrame(candidates).to_csv(candidate_csv, index=False)
+    pd.DataFrame(attachments).to_csv(attachment_csv, index=False)
+    return {"resume_dir": resume_dir, "candidate_csv": candidate_csv, "attachment_csv": attachment_csv}
@@ -0,0 +1,254 @@
+import json
+import math
+import time
+import random
+import contextlib
+import hashlib
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+EMBED_DIM = 64
+
+
+class LatencyModel:
+    """
+    Per-request latency distribution for the fake server.
+
+    kind is one of "constant" (always median_ms), "uniform" (median_ms ± spread_ms)
+    or "lognormal" (median median_ms, shape sigma), which gives a realistic long tail.
+    """
+
+    def __init__(self, kind: str = "lognormal", median_ms: float = 200.0, spread_ms: float = 100.0, sigma: float = 0.5, seed: Optional[int] = None):
+        self.kind = kind
+        self.median_ms = median_ms
+        self.spread_ms = spread_ms
+        self.sigma = sigma
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_seconds(self) -> float:
+        with self._lock:
+            if self.kind == "constant":
+                ms = self.median_ms
+            elif self.kind == "uniform":
+                ms = self._rng.uniform(self.median_ms - self.spread_ms, self.median_ms + self.spread_ms)
+            else:
+                ms = self._rng.lognormvariate(math.log(self.median_ms), self.sigma)
+        return max(0.0, ms) / 1000.0
+
+
+def instance_from_schema(schema: dict):
+    """Build a minimal value that validates against a JSON schema."""
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: instance_from_schema(sub) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [instance_from_schema(schema.get("items", {"type": "string"}))]
+    if kind == "integer":
+        if "minimum" in schema and "maximum" in schema:
+            # Spread scores so score-based cutoffs (e.g. triage) have something to cut
+            return random.randint(schema["minimum"], schema["maximum"])
+        return int(schema.get("minimum", 5))
+    if kind == "number":
+        return float(schema.get("minimum", 0.5))
+    if kind == "boolean":
+        return True
+    return "lorem ipsum"
+
+
+def fake_embedding(text: str) -> list:
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [(digest[i % len(digest)] - 128) / 128.0 for i in range(EMBED_DIM)]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Without this, delayed ACKs add ~40 ms to every small keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [self.server.model_info()]})
+        elif self.path == "/api/ps":
+            self._send_json({"models": [self.server.model_info()]})
+        elif self.path in ("/", "/api/version"):
+            self._send_json({"version": "0.0.0-fake"})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        request = self._read_json()
+        self.server.count_request()
+        if self.server.should_fail():
+            self._send_json({"error": "injected failure"}, status=500)
+            return
+
+        if self.path == "/api/chat":
+            self._chat(request)
+        elif self.path == "/api/embed":
+            inputs = request.get("input") or []
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            self._send_json({"model": request.get("model"), "embeddings": [fake_embedding(t) for t in inputs]})
+        elif self.path == "/api/generate":
+            # Used for preloading / keep_alive; no generation needed
+            self._send_json({
+                "model": request.get("model"),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "response": "",
+                "done": True,
+                "done_reason": "load",
+            })
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _send_chunk(self, payload: dict):
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+
+    def _chat(self, request: dict):
+        schema = request.get("format")
+        content = json.dumps(instance_from_schema(schema)) if isinstance(schema, dict) else "{}"
+        if self.server.think_chars:
+            content = f"<think>{'x' * self.server.think_chars}</think>\n{content}"
+
+        # Generation time grows with output length (~4 chars/token) when ms_per_token is set
+        delay = self.server.latency.sample_seconds() + self.server.ms_per_token * len(content) / 4 / 1000
+        # Requests beyond the server's parallel slots queue, like OLLAMA_NUM_PARALLEL
+        with self.server.slots:
+            time.sleep(delay)
+
+        prompt_chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+        delay_ns = int(delay * 1e9)
+        created_at = datetime.now(timezone.utc).isoformat()
+        final = {
+            "model": request.get("model"),
+            "created_at": created_at,
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": delay_ns,
+            "load_duration": 0,
+            "prompt_eval_count": max(1, prompt_chars // 4),
+            "prompt_eval_duration": delay_ns // 4,
+            "eval_count": max(1, len(content) // 4),
+            "eval_duration": delay_ns - delay_ns // 4,
+        }
+
+        if request.get("stream", True) is False:
+            self._send_json({**final, "message": {"role": "assistant", "content": content}})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for start in range(0, len(content), 16):
+                self._send_chunk({
+                    "model": request.get("model"),
+                    "created_at": created_at,
+                    "message": {"role": "assistant", "content": content[start:start + 16]},
+                    "done": False,
+                })
+            self._send_chunk({**final, "message": {"role": "assistant", "content": ""}})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading once it had the JSON it needed
+            self.close_connection = True
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: LatencyModel, error_rate: float = 0.0, model: str = "bench", think_chars: int = 0, parallel: int = 0, ms_per_token: float = 0.0):
+        super().__init__(address, FakeOllamaHandler)
+        self.ms_per_token = ms_per_token
+        # 0 means unlimited concurrent generations
+        self.slots = threading.BoundedSemaphore(parallel) if parallel else contextlib.nullcontext()
+        self.latency = latency
+        self.error_rate = error_rate
+        # Length of a <think> reasoning preamble to emit, mimicking deepseek-r1
+        self.think_chars = think_chars
+        self.model = model
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def model_info(self) -> dict:
+        return {
+            "name": self.model,
+            "model": self.model,
+            "modified_at": datetime.now(timezone.utc).isoformat(),
+            "size": 1,
+            "digest": "0" * 64,
+            "details": {},
+        }
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_fake_server(latency: Optional[LatencyModel] = None, error_rate: float = 0.0, host: str = "127.0.0.1", port: int = 0, think_chars: int = 0, parallel: int = 0, ms_per_token: float = 0.0) -> FakeOllamaServer:
+    """Start a fake Ollama server on a background thread. Stop it with .shutdown()."""
+    server = FakeOllamaServer(
+        (host, port), latency or LatencyModel(), error_rate=error_rate, think_chars=think_chars, parallel=parallel, ms_per_token=ms_per_token
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a stand-in for the Ollama API.")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", default="lognormal", choices=["constant", "uniform", "lognormal"])
+    parser.add_argument("--median-ms", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--think-chars", type=int, default=0, help="Emit a <think> block of this length before the JSON")
+    parser.add_argument("--parallel", type=int, default=0, help="Concurrent generations before requests queue (0 = unlimited)")
+    parser.add_argument("--ms-per-token", type=float, default=0.0, help="Extra latency per generated token")
+    args = parser.parse_args()
+
+    server = start_fake_server(
+        LatencyModel(args.latency, args.median_ms),
+        error_rate=args.error_rate,
+        port=args.port,
+        think_chars=args.think_chars,
+        parallel=args.parallel,
+        ms_per_token=args.ms_per_token,
+    )
+    print(f"🧪 Fake Ollama listening on {server.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,233 @@
+"""
+Offline throughput benchmark for the parsing and analysis pipelines.
+
+Runs every pipeline mode against a local fake Ollama server and a synthetic
+corpus, each mode in a fresh process so peak RSS is attributable to it:
+
+    python -m benchmarks.run_benchmark --resumes 200 --median-ms 150 --workers 8
+
+With --hosts N, N fake servers are started and the adapter balances across
+them; --parallel caps concurrent generations per server so extra hosts add
+real capacity.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing as mp
+
+import pandas as pd
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.fake_ollama import LatencyModel, start_fake_server
+
+JOB_DESCRIPTION = "Senior backend engineer: Python, Kubernetes, AWS, Kafka; 5+ years building distributed services."
+
+
+def percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _timed(fn, samples):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def _atimed(afn, samples):
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await afn(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS; children covers extraction processes
+    scale = 1 / 1024 / 1024 if sys.platform == "darwin" else 1 / 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) * scale, 1)
+
+
+def _load_corpus(corpus: dict):
+    return pd.read_csv(corpus["candidate_csv"]), pd.read_csv(corpus["attachment_csv"])
+
+
+def run_parse_mode(mode: str, corpus: dict, host: str, workers: int) -> dict:
+    from llm_adapters.ollama_adapter import OllamaAdapter
+    from utils import load_pdfs_from_attachments
+
+    llm = OllamaAdapter(model_name="bench", host=host)
+    samples = []
+    options = {"max_workers": 1}
+    if mode == "parse-threads":
+        options = {"max_workers": workers}
+    elif mode == "parse-pipeline":
+        options = {"max_workers": workers, "extract_workers": os.cpu_count() or 1}
+
+    # parse_many and parse_texts_many dispatch through the async path
+    if mode == "parse-pipeline":
+        llm.aparse_resume_text = _atimed(llm.aparse_resume_text, samples)
+    else:
+        llm.aparse_resume = _atimed(llm.aparse_resume, samples)
+
+    candidates_df, attachments_df = _load_corpus(corpus)
+    start = time.perf_counter()
+    results = load_pdfs_from_attachments(candidates_df, attachments_df, corpus["resume_dir"], llm, **options)
+    elapsed = time.perf_counter() - start
+    llm.close()
+    return {"items": len(results), "elapsed": elapsed, "samples": samples}
+
+
+def run_analyze_mode(mode: str, corpus: dict, host: str, workers: int) -> dict:
+    from llm_adapters.ollama_adapter import OllamaAdapter
+
+    llm = OllamaAdapter(model_name="bench", host=host)
+    samples = []
+    analyze = _timed(llm.analyze_resume_against_job, samples)
+    triage = _timed(llm.triage_resume, samples)
+    candidates_df, _ = _load_corpus(corpus)
+    resume = {"name": "x", "skills": ["Python", "Kubernetes"], "education": "B.Sc.", "experience": ["Built services"] * 10}
+
+    candidates = candidates_df.to_dict("records")
+
+    start = time.perf_counter()
+    if mode == "analyze-batch":
+        llm.aanalyze_resume_against_job = _atimed(llm.aanalyze_resume_against_job, samples)
+        for _, _, error in llm.analyze_many([(resume, c) for c in candidates], JOB_DESCRIPTION, max_workers=workers):
+            if error is not None:
+                raise error
+        elapsed = time.perf_counter() - start
+        llm.close()
+        return {"items": len(candidates), "elapsed": elapsed, "samples": samples}
+
+    for candidate in candidates:
+        # Triage mode only pays for the full analysis above the default cutoff
+        if mode == "analyze-triage" and triage(resume, JOB_DESCRIPTION).get("Score", 10) < 6:
+            continue
+        analyze(resume, candidate, JOB_DESCRIPTION)
+    elapsed = time.perf_counter() - start
+    llm.close()
+    return {"items": len(candidates), "elapsed": elapsed, "samples": samples}
+
+
+MODES = {
+    "parse-sequential": run_parse_mode,
+    "parse-threads": run_parse_mode,
+    "parse-pipeline": run_parse_mode,
+    "analyze-sequential": run_analyze_mode,
+    "analyze-triage": run_analyze_mode,
+    "analyze-batch": run_analyze_mode,
+}
+
+
+def _child(mode, corpus, host, workers, out_queue):
+    try:
+        result = MODES[mode](mode, corpus, host, workers)
+    except Exception as e:
+        out_queue.put({"mode": mode, "error": repr(e)})
+        return
+    samples = result.pop("samples")
+    elapsed = result["elapsed"]
+    out_queue.put({
+        "mode": mode,
+        "items": result["items"],
+        "elapsed_s": round(elapsed, 3),
+        "resumes_per_s": round(result["items"] / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "p99_ms": round(percentile(samples, 99) * 1000, 1),
+        "peak_rss_mb": _peak_rss_mb(),
+    })
+
+
+def run_benchmark(modes, corpus: dict, host: str, workers: int) -> list:
+    ctx = mp.get_context("spawn")
+    reports = []
+    for mode in modes:
+        out_queue = ctx.Queue()
+        proc = ctx.Process(target=_child, args=(mode, corpus, host, workers, out_queue))
+        proc.start()
+        report = out_queue.get()
+        proc.join()
+        reports.append(report)
+    return reports
+
+
+def print_report(reports: list):
+    header = f"{'mode':<20}{'items':>7}{'res/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in reports:
+        if "error" in r:
+            print(f"{r['mode']:<20} ❌ {r['error']}")
+            continue
+        print(
+            f"{r['mode']:<20}{r['items']:>7}{r['resumes_per_s']:>9}{r['p50_ms']:>9}"
+            f"{r['p95_ms']:>9}{r['p99_ms']:>9}{r['peak_rss_mb']:>9}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark against a fake Ollama server.")
+    parser.add_argument("--resumes", type=int, default=100, help="Synthetic corpus size")
+    parser.add_argument("--max-pages", type=int, default=3)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated modes to run")
+    parser.add_argument("--workers", type=int, default=8, help="In-flight LLM requests for concurrent modes")
+    parser.add_argument("--latency", default="lognormal", choices=["constant", "uniform", "lognormal"])
+    parser.add_argument("--median-ms", type=float, default=100.0)
+    parser.add_argument("--spread-ms", type=float, default=50.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--think-chars", type=int, default=0, help="Simulated <think> preamble length per response")
+    parser.add_argument("--hosts", type=int, default=1, help="Number of fake Ollama servers to balance across")
+    parser.add_argument("--parallel", type=int, default=0, help="Concurrent generations per server (0 = unlimited)")
+    parser.add_argument("--ms-per-token", type=float, default=0.0, help="Simulated generation cost per output token")
+    parser.add_argument("--corpus-dir", default=None, help="Reuse/keep the corpus here (default: temp dir)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}; choose from {', '.join(MODES)}")
+
+    latency = LatencyModel(args.latency, args.median_ms, args.spread_ms, args.sigma, seed=0)
+    servers = [
+        start_fake_server(
+            latency, error_rate=args.error_rate, think_chars=args.think_chars, parallel=args.parallel, ms_per_token=args.ms_per_token
+        )
+        for _ in range(max(1, args.hosts))
+    ]
+    hosts = [server.url for server in servers]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = args.corpus_dir or tmp_dir
+        print(f"🧪 Generating {args.resumes} synthetic resumes in {corpus_dir}...")
+        corpus = generate_corpus(corpus_dir, args.resumes, max_pages=args.max_pages)
+        print(f"🧪 Fake Ollama at {', '.join(hosts)} ({args.latency}, median {args.median_ms} ms)\n")
+        reports = run_benchmark(modes, corpus, hosts if len(hosts) > 1 else hosts[0], args.workers)
+    for server in servers:
+        server.shutdown()
+
+    print_report(reports)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
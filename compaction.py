@@ -0,0 +1,106 @@
+import re
+import json
+from typing import List, Optional
+
+# Rough chars-per-token ratio for English text with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+DEFAULT_PARSE_TOKEN_BUDGET = 6000
+DEFAULT_ANALYSIS_TOKEN_BUDGET = 3000
+# The triage pass only needs enough of the resume to score it
+DEFAULT_TRIAGE_TOKEN_BUDGET = 1500
+
+# Most important first; sections are trimmed from the end of this list
+SECTION_PRIORITY = ["skills", "experience", "education", "name"]
+# Never useful for judging fit against a job description
+DROPPED_FIELDS = {"email", "phone", "contact_flags", "error", "raw_output"}
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_whitespace(text: str) -> str:
+    lines = [re.sub(r"[ \t ]+", " ", line).strip() for line in text.splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def dedupe_lines(text: str) -> str:
+    seen = set()
+    kept = []
+    for line in text.splitlines():
+        key = line.lower()
+        if key and key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def compact_resume_text(text: str, max_tokens: Optional[int] = DEFAULT_PARSE_TOKEN_BUDGET) -> str:
+    """
+    Normalise whitespace, drop repeated lines and cut raw resume text to a token budget.
+
+    The head of the resume is kept since contact details, summary and the most
+    recent roles come first.
+    """
+    text = dedupe_lines(normalize_whitespace(text))
+    if max_tokens is not None and estimate_tokens(text) > max_tokens:
+        text = text[: max_tokens * CHARS_PER_TOKEN].rsplit("\n", 1)[0]
+    return text
+
+
+def _dedupe_items(items: List) -> List:
+    seen = set()
+    kept = []
+    for item in items:
+        key = normalize_whitespace(str(item)).lower()
+        if key and key not in seen:
+            seen.add(key)
+            kept.append(normalize_whitespace(item) if isinstance(item, str) else item)
+    return kept
+
+
+def _dumps(data: dict) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_resume_data(resume_data: dict, max_tokens: Optional[int] = DEFAULT_ANALYSIS_TOKEN_BUDGET) -> str:
+    """
+    Serialise a parsed resume compactly for an analysis prompt.
+
+    Contact fields and bookkeeping keys are dropped, strings are whitespace-
+    normalised and list items de-duplicated. If the JSON still exceeds the token
+    budget, the lowest-priority sections are trimmed first (trailing list items,
+    then string tails) until it fits.
+    """
+    data = {}
+    for key, value in resume_data.items():
+        if key in DROPPED_FIELDS or value in (None, "", []):
+            continue
+        if isinstance(value, str):
+            value = normalize_whitespace(value)
+        elif isinstance(value, list):
+            value = _dedupe_items(value)
+        data[key] = value
+
+    text = _dumps(data)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    order = [k for k in data if k not in SECTION_PRIORITY] + [k for k in reversed(SECTION_PRIORITY) if k in data]
+    for key in order:
+        value = data[key]
+        if isinstance(value, list):
+            while value and len(_dumps(data)) > budget:
+                value.pop()
+        elif isinstance(value, str):
+            keep = len(value) - (len(_dumps(data)) - budget) - 1
+            if keep <= 0:
+                del data[key]
+            elif keep < len(value):
+                data[key] = value[:keep] + "…"
+        if len(_dumps(data)) <= budget:
+            break
+    return _dumps(data)
@@ -0,0 +1,287 @@
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Optional
+
+import httpx
+import ollama
+
+
+class DeadlineExceeded(TimeoutError):
+    """A request ran past the controller's per-request deadline."""
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight LLM requests.
+
+    The limit grows by one after a full window of healthy completions and is
+    multiplied by backoff_ratio on an overload signal (timeout, 429/503,
+    connection error) or when the latency EWMA exceeds slow_factor times the best
+    EWMA seen (the server is queueing).
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 64, backoff_ratio: float = 0.5, slow_factor: float = 2.0):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.slow_factor = slow_factor
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._window = 0
+        self._ewma = None
+        self._baseline = None
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: Optional[float], overloaded: bool = False):
+        """Return a slot; latency is None for requests that failed for reasons unrelated to load."""
+        with self._cond:
+            self._in_flight -= 1
+            self._window += 1
+            slow = False
+            if latency is not None and not overloaded:
+                self._ewma = latency if self._ewma is None else 0.8 * self._ewma + 0.2 * latency
+                # Let the baseline drift up slowly so one lucky fast request doesn't pin it
+                self._baseline = self._ewma if self._baseline is None else min(self._baseline * 1.01, self._ewma)
+                slow = self._ewma > self.slow_factor * self._baseline
+
+            if self._window >= int(self._limit):
+                if overloaded or slow:
+                    self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                else:
+                    self._limit = min(self.max_limit, self._limit + 1)
+                self._window = 0
+            elif overloaded:
+                # Overload acts immediately, then the window restarts
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self._window = 0
+            self._cond.notify_all()
+
+
+class RetryPolicy:
+    def __init__(self, retries: int = 3, base_delay: float = 0.5, max_delay: float = 20.0):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        # Full jitter: spreads retries out so failed requests don't stampede back together
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def is_overload(error: Exception) -> bool:
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code in (429, 503)
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError, httpx.TransportError))
+
+
+def is_retryable(error: Exception) -> bool:
+    # A retry after a spent deadline would just wait as long again
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError, httpx.TransportError))
+
+
+class RequestController:
+    """
+    Runs LLM calls under an AdaptiveLimiter with a per-request deadline, jittered
+    retries and optional hedging.
+
+    The wrapped function receives its absolute deadline (time.monotonic()) so
+    streaming readers can give up mid-response. With hedge_after set, a request
+    still running after that many seconds gets a duplicate and the first to
+    finish wins.
+    """
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveLimiter] = None,
+        timeout: float = 600.0,
+        retry: Optional[RetryPolicy] = None,
+        hedge_after: Optional[float] = None,
+        metrics=None,
+    ):
+        self.limiter = limiter or AdaptiveLimiter()
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.hedge_after = hedge_after
+        self.metrics = metrics
+        self._hedge_pool = None
+        self._hedge_lock = threading.Lock()
+
+    def _count(self, name: str):
+        if self.metrics is not None:
+            self.metrics.increment(name)
+
+    def _release(self, start: float, error: Optional[Exception]):
+        if error is not None and isinstance(error, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException)):
+            self._count("llm_timeouts")
+        overloaded = error is not None and is_overload(error)
+        latency = None if error is not None and not overloaded else time.monotonic() - start
+        self.limiter.release(latency, overloaded)
+
+    def _run_once(self, fn: Callable, started: Optional[threading.Event] = None):
+        waited = time.perf_counter()
+        self.limiter.acquire()
+        if self.metrics is not None:
+            self.metrics.observe("limiter_wait", time.perf_counter() - waited)
+        if started is not None:
+            started.set()
+        start = time.monotonic()
+        try:
+            result = fn(start + self.timeout)
+        except Exception as e:
+            self._release(start, e)
+            raise
+        self._release(start, None)
+        return result
+
+    def _run_hedged(self, fn: Callable):
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=2 * self.limiter.max_limit)
+        started = threading.Event()
+        primary = self._hedge_pool.submit(self._run_once, fn, started)
+        # The hedge clock starts once the primary holds a slot, not while it queues
+        while not started.wait(0.05):
+            if primary.done():
+                return primary.result()
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        self._count("llm_hedges")
+        hedge = self._hedge_pool.submit(self._run_once, fn)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first = done.pop()
+        other = hedge if first is primary else primary
+        try:
+            result = first.result()
+        except Exception:
+            # The loser may still succeed; the deadline bounds how long we wait
+            result = other.result()
+            first = other
+        if first is hedge:
+            self._count("llm_hedge_wins")
+        return result
+
+    def _with_retries(self, attempt: Callable):
+        for n in range(self.retry.retries + 1):
+            try:
+                return attempt()
+            except Exception as e:
+                if n == self.retry.retries or not is_retryable(e):
+                    raise
+                self._count("llm_retries")
+                time.sleep(self.retry.delay(n))
+
+    def call(self, fn: Callable):
+        if self.hedge_after:
+            return self._with_retries(lambda: self._run_hedged(fn))
+        return self._with_retries(lambda: self._run_once(fn))
+
+    def call_with_retries(self, fn: Callable):
+        """
+        Retry fn() under the retry policy only: no limiter slot, deadline or hedge.
+
+        For control calls such as model loads, whose latency says nothing about
+        how loaded the server is and would skew the limiter's baseline.
+        """
+        return self._with_retries(fn)
+
+    async def _arun_once(self, afn: Callable, started: Optional[asyncio.Event] = None):
+        waited = time.perf_counter()
+        while not self.limiter.try_acquire():
+            await asyncio.sleep(0.01)
+        if self.metrics is not None:
+            self.metrics.observe("limiter_wait", time.perf_counter() - waited)
+        if started is not None:
+            started.set()
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(afn(start + self.timeout), timeout=self.timeout)
+        except asyncio.CancelledError:
+            # A cancelled hedge loser says nothing about server load
+            self.limiter.release(None)
+            raise
+        except asyncio.TimeoutError as e:
+            error = e if isinstance(e, DeadlineExceeded) else DeadlineExceeded(f"LLM request exceeded {self.timeout}s")
+            self._release(start, error)
+            if error is e:
+                raise
+            raise error from e
+        except Exception as e:
+            self._release(start, e)
+            raise
+        self._release(start, None)
+        return result
+
+    async def _arun_hedged(self, afn: Callable):
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(self._arun_once(afn, started))
+        slot_taken = asyncio.ensure_future(started.wait())
+        hedge = None
+        try:
+            await asyncio.wait([primary, slot_taken], return_when=asyncio.FIRST_COMPLETED)
+            if primary.done():
+                return primary.result()
+            done, _ = await asyncio.wait([primary], timeout=self.hedge_after)
+            if done:
+                return primary.result()
+
+            self._count("llm_hedges")
+            hedge = asyncio.ensure_future(self._arun_once(afn))
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("llm_hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # asyncio.wait never cancels what it waits on: stop the loser, and both requests
+            # when the caller itself is cancelled, so neither keeps a limiter slot or host lease
+            for task in (primary, hedge, slot_taken):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def acall(self, afn: Callable):
+        for attempt in range(self.retry.retries + 1):
+            try:
+                if self.hedge_after:
+                    return await self._arun_hedged(afn)
+                return await self._arun_once(afn)
+            except Exception as e:
+                if attempt == self.retry.retries or not is_retryable(e):
+                    raise
+                self._count("llm_retries")
+                await asyncio.sleep(self.retry.delay(attempt))
@@ -0,0 +1,126 @@
+import re
+from typing import Dict, List
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+# Horizontal whitespace only, so a number never runs on into the next line
+PHONE_RE = re.compile(r"(?<![\w@])\+?\(?\d[\d \t().-]{6,}\d(?!\w)")
+PHONE_LABEL_RE = re.compile(r"(?:\b(?:phone|tel|telephone|mobile|mob|cell|ph)\b|☎|📞)", re.IGNORECASE)
+_DATE = r"(?:\d{1,2}[./-]){0,2}(?:19|20)\d{2}"
+# Years, dates and date ranges: 2018, 09.2018, 2018 - 2020, 09.2018 - 06.2020
+DATE_RANGE_RE = re.compile(rf"{_DATE}(?:[ \t]*[-–][ \t]*{_DATE})?")
+
+
+def _digits(value: str) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def _phone_key(value: str) -> str:
+    # Compare national numbers so "+1 415..." and "415..." agree
+    return _digits(value)[-10:]
+
+
+def find_emails(text: str) -> List[str]:
+    seen = []
+    for match in EMAIL_RE.findall(text):
+        email = match.lower()
+        if email not in seen:
+            seen.append(email)
+    return seen
+
+
+def _phone_shaped(phone: str) -> bool:
+    # "+44 20 7946 0958", "(415) 555-1234", "415.555.1234": a country code or area code
+    # up front, then short digit groups, ten digits or more in all
+    if phone.startswith(("+", "(")):
+        return True
+    groups = re.findall(r"\d+", phone)
+    return (
+        len(groups) >= 3
+        and len(groups[0]) <= 4
+        and all(2 <= len(group) <= 4 for group in groups[1:])
+        and len(_digits(phone)) >= 10
+    )
+
+
+def find_phones(text: str, strict: bool = True) -> List[str]:
+    """
+    Phone numbers in text, first occurrence first.
+
+    Dates, years and anything outside 7-15 digits are always skipped. With strict
+    (the default, used for values that override the LLM) a match must also be
+    phone-shaped or follow a label such as "Phone:" on the same line.
+    """
+    seen = []
+    for match in PHONE_RE.finditer(text):
+        phone = match.group().strip()
+        digits = _digits(phone)
+        if not 7 <= len(digits) <= 15 or DATE_RANGE_RE.fullmatch(phone):
+            continue
+        if strict and not _phone_shaped(phone):
+            line = text[text.rfind("\n", 0, match.start()) + 1:match.start()]
+            if not PHONE_LABEL_RE.search(line):
+                continue
+        if digits not in [_digits(p) for p in seen]:
+            seen.append(phone)
+    return seen
+
+
+def extract_contact_fields(text: str) -> Dict[str, str]:
+    """
+    Deterministically pull contact fields out of resume text.
+
+    Returns only the fields that were found, using the first occurrence since
+    contact details almost always sit in the resume header.
+    """
+    fields = {}
+    emails = find_emails(text)
+    if emails:
+        fields["email"] = emails[0]
+    phones = find_phones(text)
+    if phones:
+        fields["phone"] = phones[0]
+    return fields
+
+
+def flag_contact_mismatches(parsed: dict, regex_fields: Dict[str, str], text: str) -> List[str]:
+    """
+    Compare LLM contact fields with the regex results and the source text.
+
+    Flags values that disagree with the regex, and values the regex couldn't
+    confirm that don't appear anywhere in the resume (likely hallucinated).
+    """
+    flags = []
+    checks = {
+        "email": (lambda v: v.strip().lower(), find_emails(text)),
+        # Any phone-like number in the text confirms the LLM's value, shaped or not
+        "phone": (_phone_key, [_phone_key(p) for p in find_phones(text, strict=False)]),
+    }
+    for field, (normalize, found) in checks.items():
+        value = parsed.get(field)
+        if not value:
+            continue
+        if field in regex_fields and normalize(value) != normalize(regex_fields[field]):
+            flags.append(f"{field}: LLM returned '{value}' but resume text has '{regex_fields[field]}'")
+        elif field not in regex_fields and normalize(value) not in found:
+            flags.append(f"{field}: LLM returned '{value}' which does not appear in the resume text")
+    return flags
+
+
+def reapply_contact_fields(parsed: dict, text: str) -> dict:
+    """
+    Fit a parse shared from a near-identical resume to this resume's own text.
+
+    Email and phone come from this text's regex pass; a shared value (the name
+    included) that does not appear in this text is cleared rather than copied over.
+    """
+    parsed = {k: v for k, v in parsed.items() if k != "contact_flags"}
+    found = extract_contact_fields(text)
+    for field in ("email", "phone"):
+        if field in found:
+            parsed[field] = found[field]
+        elif parsed.get(field) and flag_contact_mismatches({field: parsed[field]}, {}, text):
+            parsed[field] = None
+    name = parsed.get("name")
+    if isinstance(name, str) and name.strip().lower() not in " ".join(text.split()).lower():
+        parsed["name"] = None
+    return parsed
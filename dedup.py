@@ -0,0 +1,252 @@
+import os
+import json
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from lexical_index import tokenize
+from pdf_extract import read_pdf_text
+
+SIGNATURE_CACHE_PATH = os.path.join("output", "minhash_signatures.json")
+
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.9
+DEFAULT_SHINGLE_SIZE = 5
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+# Scanned or near-empty PDFs carry too little text to tell apart, so they are never near-duplicates
+MIN_TOKENS = 20
+
+# Largest prime below 2**32; (a * h + b) stays below 2**64 for 32-bit a, h and b
+_PRIME = np.uint64(4294967291)
+
+
+def shingle_hashes(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> Optional[np.ndarray]:
+    """32-bit hashes of the distinct word `size`-grams in text, or None if the text is too short."""
+    tokens = tokenize(text)
+    if len(tokens) < max(MIN_TOKENS, size):
+        return None
+    shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+class MinHasher:
+    """
+    MinHash signatures: the fraction of equal positions in two signatures
+    estimates the Jaccard similarity of the underlying shingle sets.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 32 - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        return ((np.outer(hashes, self.a) + self.b) % _PRIME).min(axis=0)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        return float(np.mean(sig_a == sig_b))
+
+
+def read_texts(paths: List[str], extract_options: Optional[dict] = None, workers: int = 1) -> List[Optional[str]]:
+    """Extract each PDF's text (None where extraction fails), in a process pool when workers > 1."""
+    read = partial(_read_or_none, **(extract_options or {}))
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(read, paths, chunksize=8))
+    return [read(path) for path in paths]
+
+
+def _read_or_none(path: str, **extract_options) -> Optional[str]:
+    # Module-level so it can be shipped to a process pool; unreadable files simply stay unique
+    try:
+        return read_pdf_text(path, **extract_options)
+    except Exception:
+        return None
+
+
+def exact_duplicates(digests: List[str], paths: Optional[List[str]] = None) -> Dict[int, dict]:
+    """
+    Link files with the same content hash to the first one.
+
+    The same path attached again (one file sent with several applications) is
+    linked as "same_file" rather than "exact": it is parsed once like any other
+    copy, but it isn't a duplicate of another file.
+
+    Returns:
+        dict: {index of a duplicate: {"of": canonical index, "kind": "exact" | "same_file", "similarity": 1.0}}.
+    """
+    duplicates = {}
+    first_by_hash = {}
+    for i, digest in enumerate(digests):
+        if digest in first_by_hash:
+            first = first_by_hash[digest]
+            kind = "same_file" if paths is not None and paths[first] == paths[i] else "exact"
+            duplicates[i] = {"of": first, "kind": kind, "similarity": 1.0}
+        else:
+            first_by_hash[digest] = i
+    return duplicates
+
+
+def file_signatures(paths: List[str], extract_options: Optional[dict] = None, workers: int = 1) -> List[Optional[np.ndarray]]:
+    """
+    MinHash signature of each PDF's text, in a process pool when workers > 1.
+
+    Only the signatures come back, so memory stays small however many files there
+    are. None where the PDF can't be read or is too short to compare (see MIN_TOKENS).
+    """
+    signature = partial(_signature_or_none, **(extract_options or {}))
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(signature, paths, chunksize=8))
+    return [signature(path) for path in paths]
+
+
+def _signature_or_none(path: str, **extract_options) -> Optional[np.ndarray]:
+    text = _read_or_none(path, **extract_options)
+    hashes = shingle_hashes(text) if text else None
+    return _hasher().signature(hashes) if hashes is not None else None
+
+
+@lru_cache(maxsize=1)
+def _hasher() -> MinHasher:
+    # One per process; the seed is fixed, so every worker computes the same signatures
+    return MinHasher()
+
+
+def near_duplicates(
+    signatures: Dict[int, np.ndarray],
+    near_threshold: float = DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    bands: int = DEFAULT_BANDS,
+) -> Dict[int, dict]:
+    """
+    Link lightly edited copies by their MinHash signatures.
+
+    Locality-sensitive hashing over `bands` slices of each signature proposes
+    candidate pairs, and pairs whose estimated Jaccard similarity reaches
+    near_threshold are linked. Each group keeps its smallest index as the
+    canonical copy.
+
+    Args:
+        signatures (dict): Signature by attachment index (see file_signatures).
+        near_threshold (float): Minimum shingle similarity for a near-duplicate.
+        bands (int): LSH bands; more bands find pairs at lower similarity. Must
+            divide the signature length.
+
+    Returns:
+        dict: {index of a duplicate: {"of": canonical index, "kind": "near", "similarity": float}}.
+    """
+    buckets = defaultdict(list)
+    for i, signature in signatures.items():
+        rows = len(signature) // bands
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows].tobytes())].append(i)
+
+    # Union-find over confirmed pairs; the smallest index is the root, so attachment order decides
+    parent = {i: i for i in signatures}
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for members in buckets.values():
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                if (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if MinHasher.similarity(signatures[i], signatures[j]) >= near_threshold:
+                    ri, rj = root(i), root(j)
+                    if ri != rj:
+                        parent[max(ri, rj)] = min(ri, rj)
+
+    duplicates = {}
+    for i in signatures:
+        canonical = root(i)
+        if canonical != i:
+            similarity = MinHasher.similarity(signatures[i], signatures[canonical])
+            duplicates[i] = {"of": canonical, "kind": "near", "similarity": round(similarity, 3)}
+    return duplicates
+
+
+class SignatureCache:
+    """
+    MinHash signatures keyed by file sha256, in one JSON file.
+
+    Lets a rerun find the same near-duplicates without extracting PDFs it has
+    already seen. Files too short to compare are stored as null so they aren't
+    re-extracted either. The cache is discarded when the shingle size, signature
+    length or extraction caps change.
+    """
+
+    def __init__(self, path: str = SIGNATURE_CACHE_PATH, extract_options: Optional[dict] = None):
+        self.path = path
+        self.version = json.dumps(
+            {"shingle_size": DEFAULT_SHINGLE_SIZE, "num_perm": DEFAULT_NUM_PERM, **(extract_options or {})},
+            sort_keys=True,
+        )
+        self.signatures = {}
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+            if stored.get("version") == self.version:
+                self.signatures = stored["signatures"]
+        except (OSError, ValueError, KeyError):
+            pass
+        self._dirty = False
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.signatures
+
+    def get(self, digest: str) -> Optional[np.ndarray]:
+        signature = self.signatures.get(digest)
+        return None if signature is None else np.array(signature, dtype=np.uint64)
+
+    def put(self, digest: str, signature: Optional[np.ndarray]):
+        self.signatures[digest] = None if signature is None else signature.tolist()
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": self.version, "signatures": self.signatures}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def merge_duplicates(exact: Dict[int, dict], near: Dict[int, dict]) -> Dict[int, dict]:
+    """Combine both passes; exact copies of a near-duplicate point at its canonical file."""
+    merged = {**exact, **near}
+    for i, link in exact.items():
+        if link["of"] in near:
+            merged[i] = {**near[link["of"]]}
+    return merged
+
+
+def report_duplicates(names: List[str], duplicates: Dict[int, dict], limit: int = 5):
+    reattached = sum(1 for link in duplicates.values() if link["kind"] == "same_file")
+    if reattached:
+        print(f"📎 {reattached} attachment(s) reuse a file already attached to another application; each file is parsed once.")
+    duplicates = {i: link for i, link in duplicates.items() if link["kind"] != "same_file"}
+    if not duplicates:
+        return
+    exact = sum(1 for link in duplicates.values() if link["kind"] == "exact")
+    print(
+        f"🪞 Duplicates: {len(duplicates)} attachment(s) reuse another file's parse"
+        f" ({exact} exact, {len(duplicates) - exact} near)."
+    )
+    for i, link in sorted(duplicates.items())[:limit]:
+        print(f"   {names[i]} → {names[link['of']]} ({link['kind']}, similarity {link['similarity']:.2f})")
+    if len(duplicates) > limit:
+        print(f"   ... and {len(duplicates) - limit} more (see the duplicates table in the result store)")
@@ -0,0 +1,185 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Optional, Union
+
+import ollama
+
+from concurrency import DeadlineExceeded
+
+
+class OllamaHost:
+    """One Ollama server: its clients, in-flight count, health and counters."""
+
+    def __init__(self, url: Optional[str], timeout: float, health_timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.client = ollama.Client(host=url, timeout=timeout)
+        # Health pings must not hang for a full generation timeout
+        self.health_client = ollama.Client(host=url, timeout=health_timeout)
+        self._async_client = None
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.requests = 0
+        self.errors = 0
+        self.busy_s = 0.0
+
+    @property
+    def async_client(self) -> ollama.AsyncClient:
+        # Created lazily so the underlying connection pool binds to the running loop
+        if self._async_client is None:
+            self._async_client = ollama.AsyncClient(host=self.url, timeout=self.timeout)
+        return self._async_client
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def close(self):
+        # The ollama clients have no close(); release their HTTP connection pools directly
+        self.client._client.close()
+        self.health_client._client.close()
+
+    async def aclose(self):
+        # Must run on the event loop the async client was first used on
+        if self._async_client is not None:
+            await self._async_client._client.aclose()
+            self._async_client = None
+
+    def stats(self) -> dict:
+        return {
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ejections": self.ejections,
+            "ejected": not self.healthy(time.monotonic()),
+            "mean_ms": round(self.busy_s / self.requests * 1000, 1) if self.requests else 0.0,
+        }
+
+
+class HostPool:
+    """
+    Least-outstanding-requests balancing across several Ollama servers.
+
+    A host is ejected for eject_seconds (doubling on repeat ejections, up to
+    max_eject_seconds) after eject_after consecutive failures or a failed health
+    check. A background thread pings every host every health_interval seconds
+    and readmits ejected ones that answer. If every host is ejected, the one due
+    back soonest is used anyway rather than failing the run.
+    """
+
+    def __init__(
+        self,
+        hosts: Union[str, list, None] = None,
+        timeout: float = 600.0,
+        eject_after: int = 3,
+        eject_seconds: float = 10.0,
+        max_eject_seconds: float = 300.0,
+        health_interval: Optional[float] = 15.0,
+        metrics=None,
+    ):
+        if not hosts or isinstance(hosts, str):
+            hosts = [hosts]
+        self.hosts = [OllamaHost(url, timeout) for url in hosts]
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+        if len(self.hosts) > 1 and health_interval:
+            self._health_thread = threading.Thread(target=self._health_loop, args=(health_interval,), daemon=True)
+            self._health_thread.start()
+
+    def _pick(self) -> OllamaHost:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [h for h in self.hosts if h.healthy(now)]
+            if not candidates:
+                candidates = [min(self.hosts, key=lambda h: h.ejected_until)]
+            fewest = min(h.outstanding for h in candidates)
+            # Random tie-break so idle hosts share the load evenly
+            host = random.choice([h for h in candidates if h.outstanding == fewest])
+            host.outstanding += 1
+            return host
+
+    def _eject(self, host: OllamaHost, reason: str):
+        # Caller holds self._lock
+        backoff = min(self.max_eject_seconds, self.eject_seconds * 2 ** host.ejections)
+        host.ejected_until = time.monotonic() + backoff
+        host.ejections += 1
+        host.consecutive_failures = 0
+        if self.metrics is not None:
+            self.metrics.increment("host_ejections")
+        print(f"⚠️ Ejecting Ollama host {host.url or 'default'} for {backoff:.0f}s ({reason}).")
+
+    def _finish(self, host: OllamaHost, seconds: float, error: Optional[Exception]):
+        if self.metrics is not None:
+            self.metrics.record_host(host.url or "default", seconds, error is None)
+        with self._lock:
+            host.outstanding -= 1
+            host.requests += 1
+            host.busy_s += seconds
+            if error is None:
+                host.consecutive_failures = 0
+                return
+            host.errors += 1
+            # A 4xx (bad request, unknown model) is the caller's fault, not the host's, and a
+            # request that outran its deadline was answering, just slowly
+            if isinstance(error, ollama.ResponseError) and 400 <= error.status_code < 500 and error.status_code != 429:
+                return
+            if isinstance(error, DeadlineExceeded):
+                return
+            host.consecutive_failures += 1
+            if host.consecutive_failures >= self.eject_after and host.healthy(time.monotonic()) and len(self.hosts) > 1:
+                self._eject(host, f"{host.consecutive_failures} consecutive failures")
+
+    @contextmanager
+    def lease(self):
+        """Borrow the least-loaded healthy host for one request."""
+        host = self._pick()
+        start = time.perf_counter()
+        try:
+            yield host
+        except BaseException as e:
+            self._finish(host, time.perf_counter() - start, e if isinstance(e, Exception) else None)
+            raise
+        self._finish(host, time.perf_counter() - start, None)
+
+    def _health_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.check_health()
+
+    def check_health(self):
+        for host in self.hosts:
+            try:
+                host.health_client.ps()
+                ok = True
+            except Exception:
+                ok = False
+            with self._lock:
+                now = time.monotonic()
+                if ok and not host.healthy(now):
+                    host.ejected_until = 0.0
+                    host.consecutive_failures = 0
+                    print(f"✅ Ollama host {host.url or 'default'} is back.")
+                elif ok:
+                    # A sustained clean run forgives earlier ejections
+                    host.ejections = max(0, host.ejections - 1)
+                elif host.healthy(now):
+                    self._eject(host, "health check failed")
+
+    def close(self):
+        """Stop the health checks and close every host's connections."""
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+        for host in self.hosts:
+            host.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {host.url or "default": host.stats() for host in self.hosts}
@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import math
+import hashlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LEXICAL_INDEX_PATH = os.path.join("output", "bm25_index.json")
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "our", "the", "to", "we", "will", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        # Keep "node.js" and "c++" intact but drop sentence-ending dots
+        token = token.rstrip(".")
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def resume_search_text(parsed_resume: dict) -> str:
+    parts = []
+    for field in ("skills", "experience", "education"):
+        value = parsed_resume.get(field)
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        elif value:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+class BM25Index:
+    """
+    Inverted index over parsed resumes scored with Okapi BM25.
+
+    Documents are keyed by resume file name and can be added, replaced or removed
+    incrementally, so one persisted index is reused across job descriptions and runs.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_hash: Dict[str, str] = {}
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def add(self, doc_id: str, text: str):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self.doc_hash.get(doc_id) == digest:
+            return
+        self.remove(doc_id)
+        counts = Counter(tokenize(text))
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.doc_len[doc_id] = sum(counts.values())
+        self.doc_hash[doc_id] = digest
+
+    def remove(self, doc_id: str):
+        if doc_id not in self.doc_len:
+            return
+        for term in list(self.postings):
+            docs = self.postings[term]
+            if docs.pop(doc_id, None) is not None and not docs:
+                del self.postings[term]
+        del self.doc_len[doc_id]
+        del self.doc_hash[doc_id]
+
+    def update_from_resumes(self, resumes_data: Iterable[dict]):
+        for entry in resumes_data:
+            if "error" in entry["parsed_resume"]:
+                continue
+            self.add(entry["resume_file"], resume_search_text(entry["parsed_resume"]))
+
+    def score(self, query: str, doc_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        n_docs = len(self.doc_len)
+        if not n_docs:
+            return {}
+        allowed = set(doc_ids) if doc_ids is not None else None
+        avg_len = sum(self.doc_len.values()) / n_docs
+        scores: Dict[str, float] = {}
+        for term, qtf in Counter(tokenize(query)).items():
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = tf + self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + qtf * idf * tf * (self.k1 + 1) / norm
+        return scores
+
+    def rank(
+        self,
+        query: str,
+        doc_ids: Optional[Iterable[str]] = None,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        ranked = sorted(self.score(query, doc_ids).items(), key=lambda item: item[1], reverse=True)
+        if min_score is not None:
+            ranked = [item for item in ranked if item[1] >= min_score]
+        if top_k is not None:
+            ranked = ranked[:top_k]
+        return ranked
+
+    def save(self, path: str = LEXICAL_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "postings": self.postings,
+                "doc_len": self.doc_len,
+                "doc_hash": self.doc_hash,
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = LEXICAL_INDEX_PATH) -> "BM25Index":
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        index.k1, index.b = data["k1"], data["b"]
+        index.postings = data["postings"]
+        index.doc_len = data["doc_len"]
+        index.doc_hash = data["doc_hash"]
+        return index
+
+
+def shortlist_resumes(
+    resumes_data: List[dict],
+    job_description: str,
+    index,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+) -> List[dict]:
+    """
+    Rank resumes against a job description and keep the top-K and/or those above
+    min_score, best first. Each kept entry is returned as a copy with a
+    'relevance_score', so the caller's entries are never modified.
+
+    Works with any index exposing `rank(query, doc_ids, top_k, min_score)`, i.e.
+    BM25Index or vector_index.VectorIndex. Entries sharing a resume file (one
+    file attached to several applications) share its score and keep their
+    order in resumes_data.
+    """
+    positions = defaultdict(list)
+    for position, entry in enumerate(resumes_data):
+        positions[entry["resume_file"]].append(position)
+    ranked = index.rank(job_description, doc_ids=positions, top_k=top_k, min_score=min_score)
+    shortlist = [
+        {**resumes_data[position], "relevance_score": round(score, 4)}
+        for doc_id, score in ranked
+        for position in positions[doc_id]
+    ]
+    return shortlist[:top_k] if top_k is not None else shortlist
@@ -1,4 +1,66 @@
+import time
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+BatchResult = Tuple[int, Optional[dict], Optional[Exception]]
+
+_EXHAUSTED = object()
+
+
+def iter_bounded(submit, calls: Iterable[tuple], max_workers: int = 4) -> Iterator[BatchResult]:
+    """
+    Keep up to max_workers calls in flight via submit(args) -> Future.
+
+    Calls are pulled from the iterable only as slots free up, so it may be a
+    stream. If the consumer stops early (an exception, Ctrl-C, or closing the
+    generator), every call still in flight is cancelled.
+
+    Yields:
+        tuple: (position in calls, result or None, exception or None), in completion order.
+    """
+    calls = iter(calls)
+    in_flight = {}
+    submitted = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(in_flight) < max(1, max_workers):
+                args = next(calls, _EXHAUSTED)
+                if args is _EXHAUSTED:
+                    exhausted = True
+                    break
+                in_flight[submit(args)] = submitted
+                submitted += 1
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = in_flight.pop(future)
+                try:
+                    yield i, future.result(), None
+                except Exception as e:
+                    yield i, None, e
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def iter_concurrent(fn, calls: Iterable[tuple], max_workers: int = 4, metrics=None) -> Iterator[BatchResult]:
+    """Run fn(*args) for each tuple in calls on a thread pool (see iter_bounded)."""
+    def run(args, submitted):
+        if metrics is not None:
+            metrics.observe("queue_wait", time.perf_counter() - submitted)
+        return fn(*args)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        yield from iter_bounded(lambda args: pool.submit(run, args, time.perf_counter()), calls, max_workers)
+    finally:
+        # Don't wait for calls already running when the consumer gave up early
+        pool.shutdown(wait=False, cancel_futures=True)
+
 
 class LLMAdapter(ABC):
     @abstractmethod
@@ -8,3 +70,55 @@ class LLMAdapter(ABC):
     @abstractmethod
     def analyze_resume_against_job(self, resume_data: dict, candidate_meta: dict, job_description: str) -> dict:
         pass
+
+    # Optional capabilities are methods a backend may define; they have no base version,
+    # so check supports() before calling them:
+    #   parse_resume_text(resume_text) -> dict  lets callers extract PDF text separately (see pipeline.py)
+    #   embed(texts) -> list                    one embedding vector per text, for semantic shortlisting
+    def supports(self, method: str) -> bool:
+        return callable(getattr(self, method, None))
+
+    def triage_resume(self, resume_data: dict, job_description: str) -> dict:
+        # Optional: cheap {"Score", "Reason"} screen run before the full analysis. Without
+        # one, screen with the full analysis's overall assessment; slower, but the same shape
+        analysis = self.analyze_resume_against_job(resume_data, {}, job_description)
+        if "error" in analysis:
+            return analysis
+        assessment = analysis.get("Overall Match Assessment") or {}
+        return {"Score": assessment.get("Score"), "Reason": assessment.get("Justification")}
+
+    def preload(self, model: str = None) -> bool:
+        # Optional: load a model ahead of a batch so the first request isn't a cold start;
+        # returns whether it is loaded, and never raises
+        return True
+
+    def release(self, model: str = None):
+        # Optional: let the backend unload a model once its share of the batch is done
+        pass
+
+    # Batch variants yield (index, result, error) in completion order. The defaults
+    # run the single-item methods on a thread pool; backends with server-side
+    # batching or cheaper request multiplexing should override them.
+    def parse_many(self, pdf_paths: List[str], max_workers: int = 4) -> Iterator[BatchResult]:
+        calls = [(path,) for path in pdf_paths]
+        return iter_concurrent(self.parse_resume, calls, max_workers, getattr(self, "metrics", None))
+
+    def parse_texts_many(self, texts: Iterable[str], max_workers: int = 4) -> Iterator[BatchResult]:
+        """Parse already-extracted resume texts; texts may be a stream (see pipeline.py). Needs parse_resume_text."""
+        return iter_concurrent(self.parse_resume_text, ((text,) for text in texts), max_workers, getattr(self, "metrics", None))
+
+    def analyze_many(self, items: List[Tuple[dict, dict]], job_description: str, max_workers: int = 4) -> Iterator[BatchResult]:
+        """Analyze (resume_data, candidate_meta) pairs against one job description."""
+        calls = [(resume_data, candidate_meta, job_description) for resume_data, candidate_meta in items]
+        return iter_concurrent(self.analyze_resume_against_job, calls, max_workers, getattr(self, "metrics", None))
+
+    def triage_many(self, resumes: List[dict], job_description: str, max_workers: int = 4) -> Iterator[BatchResult]:
+        calls = [(resume_data, job_description) for resume_data in resumes]
+        return iter_concurrent(self.triage_resume, calls, max_workers, getattr(self, "metrics", None))
+
+    # Async variants; backends with a native async client should override these
+    async def aparse_resume(self, pdf_path: str) -> dict:
+        return await asyncio.to_thread(self.parse_resume, pdf_path)
+
+    async def aanalyze_resume_against_job(self, resume_data: dict, candidate_meta: dict, job_description: str) -> dict:
+        return await asyncio.to_thread(self.analyze_resume_against_job, resume_data, candidate_meta, job_description)
@@ -1,71 +1,293 @@
-from llm_adapters.base import LLMAdapter
-import ollama
-import fitz  # PyMuPDF for PDF parsing
+from llm_adapters.base import BatchResult, LLMAdapter, iter_bounded
+import asyncio
+import time
 import json
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Tuple
 
-from prompts import build_prompt
+from concurrency import AdaptiveLimiter, DeadlineExceeded, RequestController, RetryPolicy
+from host_pool import HostPool
+from compaction import (
+    compact_resume_data,
+    compact_resume_text,
+    DEFAULT_ANALYSIS_TOKEN_BUDGET,
+    DEFAULT_PARSE_TOKEN_BUDGET,
+    DEFAULT_TRIAGE_TOKEN_BUDGET,
+)
+from metrics import LLM_COUNTERS, PromptEvalStats, RunMetrics
+from stream_json import StreamingJSONParser
+from contact_fields import extract_contact_fields, flag_contact_mismatches
+from pdf_extract import read_pdf_text, DEFAULT_MAX_PAGES, DEFAULT_MAX_CHARS
+from prompts import build_prompt, build_triage_prompt
+
+RESUME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "email": {"type": "string"},
+        "phone": {"type": "string"},
+        "skills": {"type": "array", "items": {"type": "string"}},
+        "education": {"type": "string"},
+        "experience": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": [
+        "name",
+        "email",
+        "phone",
+        "skills",
+        "education",
+        "experience",
+    ],
+}
+
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "Overall Match Assessment": {
+            "type": "object",
+            "properties": {
+                "Score": {"type": "integer", "minimum": 1, "maximum": 10},
+                "Justification": {"type": "string"},
+            },
+            "required": ["Score", "Justification"],
+        },
+        "Skill and Experience Alignment": {
+            "type": "object",
+            "properties": {
+                "Required Skills": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                },
+                "Candidate Skills": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "Skill": {"type": "string"},
+                            "Evidence": {"type": "string"},
+                            "Proficiency Level": {
+                                "type": "string",
+                                "enum": [
+                                    "Beginner",
+                                    "Intermediate",
+                                    "Advanced",
+                                ],
+                            },
+                            "Gap Analysis": {"type": "string"},
+                        },
+                        "required": [
+                            "Skill",
+                            "Evidence",
+                            "Proficiency Level",
+                        ],
+                    },
+                },
+                "Desired Skills": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                },
+            },
+            "required": ["Required Skills", "Candidate Skills"],
+        },
+        "Experience Depth & Relevance": {
+            "type": "object",
+            "properties": {
+                "Relevant Experience": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                },
+                "Impact & Quantifiable Results": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                },
+                "Years of Experience": {"type": "integer"},
+            },
+            "required": [
+                "Relevant Experience",
+                "Impact & Quantifiable Results",
+            ],
+        },
+        "Action Verb and Achievement Focus": {
+            "type": "object",
+            "properties": {
+                "Action Verb Strength": {
+                    "type": "object",
+                    "properties": {
+                        "Strong Verbs": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                        },
+                        "Weak Verbs": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                        },
+                        "Suggestions": {"type": "string"},
+                    },
+                },
+                "Achievement-Oriented Language": {"type": "string"},
+            },
+            "required": [
+                "Action Verb Strength",
+                "Achievement-Oriented Language",
+            ],
+        },
+        "Red Flags & Concerns": {
+            "type": "array",
+            "items": {"type": "string"},
+        },
+        "Overall Recommendation": {
+            "type": "object",
+            "properties": {
+                "Recommendation": {
+                    "type": "string",
+                    "enum": [
+                        "Strongly Recommend for Interview",
+                        "Recommend with Reservations",
+                        "Do Not Recommend",
+                    ],
+                },
+                "Justification": {"type": "string"},
+            },
+            "required": ["Recommendation", "Justification"],
+        },
+    },
+    "required": [
+        "Overall Match Assessment",
+        "Skill and Experience Alignment",
+        "Experience Depth & Relevance",
+        "Action Verb and Achievement Focus",
+        "Red Flags & Concerns",
+        "Overall Recommendation",
+    ],
+}
+
+TRIAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "Score": {"type": "integer", "minimum": 1, "maximum": 10},
+        "Reason": {"type": "string"},
+    },
+    "required": ["Score", "Reason"],
+}
+
+# Chunks read after the JSON closes while waiting for the final counters chunk
+MAX_TRAILING_CHUNKS = 16
 
 
 class OllamaAdapter(LLMAdapter):
-    def __init__(self, model_name="mistral"):
+    # Bump whenever the parse prompt, schema or regex contact pass changes so cached parses are invalidated
+    parse_version = "4"
+
+    def __init__(
+        self,
+        model_name="mistral",
+        host=None,
+        max_concurrency=8,
+        max_pages=DEFAULT_MAX_PAGES,
+        max_chars=DEFAULT_MAX_CHARS,
+        embed_model="nomic-embed-text",
+        parse_token_budget=DEFAULT_PARSE_TOKEN_BUDGET,
+        analysis_token_budget=DEFAULT_ANALYSIS_TOKEN_BUDGET,
+        metrics=None,
+        parse_model=None,
+        keep_alive="30m",
+        stream=True,
+        initial_concurrency=4,
+        request_timeout=600.0,
+        max_retries=3,
+        hedge_after=None,
+        triage_model=None,
+        triage_token_budget=DEFAULT_TRIAGE_TOKEN_BUDGET,
+    ):
         self.model = model_name
+        # Parsing can use a smaller/faster model than analysis
+        self.parse_model = parse_model or model_name
+        # The score-only triage pass can also run on a small model
+        self.triage_model = triage_model or model_name
+        # How long the server keeps a model resident after each request
+        self.keep_alive = keep_alive
+        # Stream responses so reasoning blocks are dropped and JSON is parsed as it arrives
+        self.stream = stream
+        self.embed_model = embed_model
+        # A single URL or a list of them; requests go to the least-busy healthy host
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.extract_options = {"max_pages": max_pages, "max_chars": max_chars}
+        self.parse_token_budget = parse_token_budget
+        self.analysis_token_budget = analysis_token_budget
+        self.triage_token_budget = triage_token_budget
+        self.request_timeout = request_timeout
+        # Prompt-eval counters of analysis requests, to measure prefix-cache reuse
+        self.prompt_stats = PromptEvalStats()
+        self.metrics = metrics or RunMetrics()
+        # Pooled clients per host instead of the module-level default
+        self.pool = HostPool(host, timeout=request_timeout, metrics=self.metrics)
+        n_hosts = len(self.pool.hosts)
+        # In-flight requests adapt between 1 and max_concurrency per host; callers may run more threads than that
+        self.controller = RequestController(
+            limiter=AdaptiveLimiter(
+                initial=min(initial_concurrency, max_concurrency) * n_hosts,
+                max_limit=max_concurrency * n_hosts,
+            ),
+            timeout=request_timeout,
+            retry=RetryPolicy(retries=max_retries),
+            hedge_after=hedge_after,
+            metrics=self.metrics,
+        )
+        # Event loop for the batch methods, started on first use
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
 
     def _read_pdf_text(self, pdf_path):
-        doc = fitz.open(pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
-
-    def parse_resume(self, pdf_path: str) -> dict:
-        resume_text = self._read_pdf_text(pdf_path)
+        with self.metrics.stage("pdf_extract"):
+            return read_pdf_text(pdf_path, **self.extract_options)
 
+    def _parse_request(self, resume_text: str, known_fields: dict = None) -> dict:
+        # Only ask the LLM for fields the regex fast path couldn't fill
+        fields = [f for f in RESUME_SCHEMA["required"] if f not in (known_fields or {})]
+        labels = {"skills": "skills (as list)"}
         prompt = (
             "Extract the following details from the candidate resume below and return as JSON:\n"
-            "- name\n- email\n- phone\n- skills (as list)\n- education\n- experience\n\n"
-            f"Resume:\n{resume_text}\n\n"
-            "Respond in JSON format with keys exactly: name, email, phone, skills, education, experience."
+            + "".join(f"- {labels.get(f, f)}\n" for f in fields)
+            + f"\nResume:\n{compact_resume_text(resume_text, self.parse_token_budget)}\n\n"
+            f"Respond in JSON format with keys exactly: {', '.join(fields)}."
         )
-
-        response = ollama.chat(
-            model=self.model,
-            messages=[
+        schema = {
+            "type": "object",
+            "properties": {f: RESUME_SCHEMA["properties"][f] for f in fields},
+            "required": fields,
+        }
+        return {
+            "model": self.parse_model,
+            "keep_alive": self.keep_alive,
+            "messages": [
                 {"role": "system", "content": "You are a resume parsing assistant."},
                 {"role": "user", "content": prompt},
             ],
-            format={
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string"},
-                    "email": {"type": "string"},
-                    "phone": {"type": "string"},
-                    "skills": {"type": "array", "items": {"type": "string"}},
-                    "education": {"type": "string"},
-                    "experience": {"type": "array", "items": {"type": "string"}},
-                },
-                "required": [
-                    "name",
-                    "email",
-                    "phone",
-                    "skills",
-                    "education",
-                    "experience",
-                ],
-            },
-        )
-
-        return self._safe_json_parse(response["message"]["content"])
+            "format": schema,
+        }
 
-    def analyze_resume_against_job(
-        self, resume_data: dict, candidate_meta: dict, job_description: str
-    ) -> dict:
-        resume_str = json.dumps(resume_data, indent=2)
-        candidate_str = json.dumps(candidate_meta, indent=2)
+    def _finish_parse(self, raw_output: str, resume_text: str, known_fields: dict) -> dict:
+        parsed = self._safe_json_parse(raw_output)
+        if "error" in parsed:
+            return parsed
+        flags = flag_contact_mismatches(parsed, known_fields, resume_text)
+        # Regex values win over anything the LLM produced for the same field
+        parsed.update(known_fields)
+        parsed = {**{f: parsed.get(f) for f in RESUME_SCHEMA["required"]}, **parsed}
+        if flags:
+            parsed["contact_flags"] = flags
+        return parsed
 
-        response = ollama.chat(
-            model=self.model,
-            messages=[
+    def _analysis_request(self, resume_data: dict, job_description: str) -> dict:
+        resume_str = compact_resume_data(resume_data, self.analysis_token_budget)
+        return {
+            "model": self.model,
+            "keep_alive": self.keep_alive,
+            "messages": [
                 {
                     "role": "user",
                     "content": build_prompt(
@@ -75,134 +297,268 @@ class OllamaAdapter(LLMAdapter):
                     ),
                 },
             ],
-            format={
-                "type": "object",
-                "properties": {
-                    "Overall Match Assessment": {
-                        "type": "object",
-                        "properties": {
-                            "Score": {"type": "integer", "minimum": 1, "maximum": 10},
-                            "Justification": {"type": "string"},
-                        },
-                        "required": ["Score", "Justification"],
-                    },
-                    "Skill and Experience Alignment": {
-                        "type": "object",
-                        "properties": {
-                            "Required Skills": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                            },
-                            "Candidate Skills": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "Skill": {"type": "string"},
-                                        "Evidence": {"type": "string"},
-                                        "Proficiency Level": {
-                                            "type": "string",
-                                            "enum": [
-                                                "Beginner",
-                                                "Intermediate",
-                                                "Advanced",
-                                            ],
-                                        },
-                                        "Gap Analysis": {"type": "string"},
-                                    },
-                                    "required": [
-                                        "Skill",
-                                        "Evidence",
-                                        "Proficiency Level",
-                                    ],
-                                },
-                            },
-                            "Desired Skills": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                            },
-                        },
-                        "required": ["Required Skills", "Candidate Skills"],
-                    },
-                    "Experience Depth & Relevance": {
-                        "type": "object",
-                        "properties": {
-                            "Relevant Experience": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                            },
-                            "Impact & Quantifiable Results": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                            },
-                            "Years of Experience": {"type": "integer"},
-                        },
-                        "required": [
-                            "Relevant Experience",
-                            "Impact & Quantifiable Results",
-                        ],
-                    },
-                    "Action Verb and Achievement Focus": {
-                        "type": "object",
-                        "properties": {
-                            "Action Verb Strength": {
-                                "type": "object",
-                                "properties": {
-                                    "Strong Verbs": {
-                                        "type": "array",
-                                        "items": {"type": "string"},
-                                    },
-                                    "Weak Verbs": {
-                                        "type": "array",
-                                        "items": {"type": "string"},
-                                    },
-                                    "Suggestions": {"type": "string"},
-                                },
-                            },
-                            "Achievement-Oriented Language": {"type": "string"},
-                        },
-                        "required": [
-                            "Action Verb Strength",
-                            "Achievement-Oriented Language",
-                        ],
-                    },
-                    "Red Flags & Concerns": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                    },
-                    "Overall Recommendation": {
-                        "type": "object",
-                        "properties": {
-                            "Recommendation": {
-                                "type": "string",
-                                "enum": [
-                                    "Strongly Recommend for Interview",
-                                    "Recommend with Reservations",
-                                    "Do Not Recommend",
-                                ],
-                            },
-                            "Justification": {"type": "string"},
-                        },
-                        "required": ["Recommendation", "Justification"],
-                    },
-                },
-                "required": [
-                    "Overall Match Assessment",
-                    "Skill and Experience Alignment",
-                    "Experience Depth & Relevance",
-                    "Action Verb and Achievement Focus",
-                    "Red Flags & Concerns",
-                    "Overall Recommendation",
-                ],
-            },
-        )
+            "format": ANALYSIS_SCHEMA,
+        }
+
+    def _triage_request(self, resume_data: dict, job_description: str) -> dict:
+        resume_str = compact_resume_data(resume_data, self.triage_token_budget)
+        return {
+            "model": self.triage_model,
+            "keep_alive": self.keep_alive,
+            "messages": [
+                {"role": "user", "content": build_triage_prompt(job_description=job_description, resume=resume_str)},
+            ],
+            "format": TRIAGE_SCHEMA,
+        }
+
+    def _record_response(self, kind: str, request: dict, response):
+        self.metrics.record_llm(kind, response)
+        if kind == "analyze":
+            self.prompt_stats.record(len(request["messages"][-1]["content"]), response)
+
+    def _feed_chunk(self, parser: StreamingJSONParser, state: dict, chunk) -> bool:
+        """Feed one streamed chunk; returns True once the stream can be abandoned."""
+        if time.monotonic() > state["deadline"]:
+            raise DeadlineExceeded(f"LLM {state['kind']} request exceeded {self.request_timeout}s")
+        if chunk.get("done"):
+            state["final"] = chunk
+            return True
+        if parser.error is not None:
+            return True
+        if parser.done:
+            # Only waiting for the final chunk with the eval counters now
+            state["trailing"] += 1
+            return state["trailing"] > MAX_TRAILING_CHUNKS
+        if parser.feed(chunk["message"]["content"]) and parser.done:
+            self.metrics.observe(f"llm_{state['kind']}_to_json", time.perf_counter() - state["started"])
+        return parser.error is not None
+
+    def _stream_response(self, parser: StreamingJSONParser, state: dict) -> dict:
+        final = state["final"] or {}
+        response = {counter: final.get(counter) for counter in LLM_COUNTERS}
+        response["message"] = {"content": parser.text}
+        if parser.error:
+            print(f"❌ Malformed LLM output detected while streaming: {parser.error}")
+        return response
+
+    def _chat_once(self, kind: str, request: dict, deadline: float):
+        with self.pool.lease() as host:
+            if not self.stream:
+                return host.client.chat(**request)
+            parser = StreamingJSONParser()
+            state = {"kind": kind, "started": time.perf_counter(), "deadline": deadline, "trailing": 0, "final": None}
+            chunks = host.client.chat(**request, stream=True)
+            try:
+                for chunk in chunks:
+                    if self._feed_chunk(parser, state, chunk):
+                        break
+            finally:
+                # Closing the generator drops the HTTP response mid-stream if needed
+                chunks.close()
+            return self._stream_response(parser, state)
+
+    def _chat(self, kind: str, request: dict):
+        with self.metrics.stage(f"llm_{kind}"):
+            response = self.controller.call(lambda deadline: self._chat_once(kind, request, deadline))
+        self._record_response(kind, request, response)
+        return response
+
+    async def _achat_once(self, kind: str, request: dict, deadline: float):
+        with self.pool.lease() as host:
+            if not self.stream:
+                return await host.async_client.chat(**request)
+            parser = StreamingJSONParser()
+            state = {"kind": kind, "started": time.perf_counter(), "deadline": deadline, "trailing": 0, "final": None}
+            chunks = await host.async_client.chat(**request, stream=True)
+            try:
+                async for chunk in chunks:
+                    if self._feed_chunk(parser, state, chunk):
+                        break
+            finally:
+                await chunks.aclose()
+            return self._stream_response(parser, state)
+
+    async def _achat(self, kind: str, request: dict):
+        with self.metrics.stage(f"llm_{kind}"):
+            response = await self.controller.acall(lambda deadline: self._achat_once(kind, request, deadline))
+        self._record_response(kind, request, response)
+        return response
+
+    def _each_host(self, fn):
+        # Model residency is per server, so load/unload on every host in parallel
+        with ThreadPoolExecutor(max_workers=len(self.pool.hosts)) as pool:
+            return list(pool.map(fn, self.pool.hosts))
+
+    def preload(self, model: str = None) -> bool:
+        """
+        Load a model on every host ahead of a batch, with the usual retries.
+
+        Returns:
+            bool: Whether any host loaded it. If none did, requests load it on
+            demand (or fail and are retried), so this only warns.
+        """
+        # An empty generate request loads the model and pins it for keep_alive
+        model = model or self.model
+
+        def load(host):
+            try:
+                return self.controller.call_with_retries(
+                    lambda: host.client.generate(model=model, prompt="", keep_alive=self.keep_alive)
+                )
+            except Exception as e:
+                print(f"⚠️ Could not preload {model} on {host.url or 'default'}: {e}")
+                return e
+
+        with self.metrics.stage("model_load"):
+            responses = self._each_host(load)
+        loaded = [r for r in responses if not isinstance(r, Exception)]
+        for response in loaded:
+            self.metrics.record_llm("load", response)
+        if not loaded:
+            print(f"⚠️ {model} is not preloaded on any host; the first requests will load it.")
+        return bool(loaded)
+
+    def release(self, model: str = None):
+        model = model or self.model
+
+        def unload(host):
+            try:
+                host.client.generate(model=model, prompt="", keep_alive=0)
+            except Exception as e:
+                # Best effort: an unreachable host frees its memory when keep_alive lapses anyway
+                print(f"⚠️ Could not release {model} on {host.url or 'default'}: {e}")
+
+        self._each_host(unload)
+
+    def parse_resume(self, pdf_path: str) -> dict:
+        return self.parse_resume_text(self._read_pdf_text(pdf_path))
+
+    def parse_resume_text(self, resume_text: str) -> dict:
+        with self.metrics.stage("prompt_build"):
+            known_fields = extract_contact_fields(resume_text)
+            request = self._parse_request(resume_text, known_fields)
+        response = self._chat("parse", request)
+        with self.metrics.stage("json_parse"):
+            return self._finish_parse(response["message"]["content"], resume_text, known_fields)
+
+    def analyze_resume_against_job(
+        self, resume_data: dict, candidate_meta: dict, job_description: str
+    ) -> dict:
+        with self.metrics.stage("prompt_build"):
+            request = self._analysis_request(resume_data, job_description)
+        response = self._chat("analyze", request)
+        with self.metrics.stage("json_parse"):
+            return self._safe_json_parse(response["message"]["content"])
+
+    def triage_resume(self, resume_data: dict, job_description: str) -> dict:
+        with self.metrics.stage("prompt_build"):
+            request = self._triage_request(resume_data, job_description)
+        response = self._chat("triage", request)
+        with self.metrics.stage("json_parse"):
+            return self._safe_json_parse(response["message"]["content"])
+
+    def _embed_once(self, texts: list):
+        with self.pool.lease() as host:
+            return host.client.embed(model=self.embed_model, input=texts, keep_alive=self.keep_alive)
+
+    def embed(self, texts: list) -> list:
+        with self.metrics.stage("llm_embed"):
+            response = self.controller.call(lambda deadline: self._embed_once(texts))
+        return response["embeddings"]
+
+    async def aparse_resume(self, pdf_path: str) -> dict:
+        # PDF extraction is CPU-bound, keep it off the event loop
+        resume_text = await asyncio.to_thread(self._read_pdf_text, pdf_path)
+        return await self.aparse_resume_text(resume_text)
+
+    async def aparse_resume_text(self, resume_text: str) -> dict:
+        with self.metrics.stage("prompt_build"):
+            known_fields = extract_contact_fields(resume_text)
+            request = self._parse_request(resume_text, known_fields)
+        response = await self._achat("parse", request)
+        with self.metrics.stage("json_parse"):
+            return self._finish_parse(response["message"]["content"], resume_text, known_fields)
+
+    async def aanalyze_resume_against_job(
+        self, resume_data: dict, candidate_meta: dict, job_description: str
+    ) -> dict:
+        with self.metrics.stage("prompt_build"):
+            request = self._analysis_request(resume_data, job_description)
+        response = await self._achat("analyze", request)
+        with self.metrics.stage("json_parse"):
+            return self._safe_json_parse(response["message"]["content"])
+
+    async def atriage_resume(self, resume_data: dict, job_description: str) -> dict:
+        with self.metrics.stage("prompt_build"):
+            request = self._triage_request(resume_data, job_description)
+        response = await self._achat("triage", request)
+        with self.metrics.stage("json_parse"):
+            return self._safe_json_parse(response["message"]["content"])
+
+    def _batch_loop(self) -> asyncio.AbstractEventLoop:
+        # One long-lived loop, so each host's async client stays bound to it across batches
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    def close(self):
+        """Stop the batch event loop and the host health checks, and close all connections."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is not None:
+            async def shutdown():
+                for host in self.pool.hosts:
+                    await host.aclose()
+                # Finish closing abandoned response streams before the loop goes away
+                await loop.shutdown_asyncgens()
+
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+        self.pool.close()
+
+    def _iter_async(self, make_coro, calls: List[tuple], max_workers: int) -> Iterator[BatchResult]:
+        """
+        Multiplex a batch of requests as coroutines on one event loop.
+
+        Up to max_workers requests are dispatched at once without a thread each;
+        the adaptive limiter still decides how many each host actually sees.
+        Requests still running when the consumer stops early are cancelled.
+        """
+        loop = self._batch_loop()
+
+        async def run(args, submitted):
+            self.metrics.observe("queue_wait", time.perf_counter() - submitted)
+            return await make_coro(*args)
+
+        def submit(args):
+            return asyncio.run_coroutine_threadsafe(run(args, time.perf_counter()), loop)
+
+        return iter_bounded(submit, calls, max_workers)
+
+    def parse_many(self, pdf_paths: List[str], max_workers: int = 4) -> Iterator[BatchResult]:
+        return self._iter_async(self.aparse_resume, [(path,) for path in pdf_paths], max_workers)
+
+    def parse_texts_many(self, texts: Iterable[str], max_workers: int = 4) -> Iterator[BatchResult]:
+        return self._iter_async(self.aparse_resume_text, ((text,) for text in texts), max_workers)
+
+    def analyze_many(self, items: List[Tuple[dict, dict]], job_description: str, max_workers: int = 4) -> Iterator[BatchResult]:
+        calls = [(resume_data, candidate_meta, job_description) for resume_data, candidate_meta in items]
+        return self._iter_async(self.aanalyze_resume_against_job, calls, max_workers)
 
-        return self._safe_json_parse(response["message"]["content"])
+    def triage_many(self, resumes: List[dict], job_description: str, max_workers: int = 4) -> Iterator[BatchResult]:
+        return self._iter_async(self.atriage_resume, [(resume_data, job_description) for resume_data in resumes], max_workers)
 
     def _safe_json_parse(self, raw_text: str) -> dict:
         try:
-            # Remove any junk before/after the JSON (some LLMs add text)
-            json_text = re.search(r"\{.*\}", raw_text, re.DOTALL).group(0)
+            # Drop reasoning blocks, then any junk before/after the JSON (some LLMs add text)
+            answer = re.sub(r"<think>.*?</think>", "", raw_text, flags=re.DOTALL)
+            json_text = re.search(r"\{.*\}", answer, re.DOTALL).group(0)
             return json.loads(json_text)
         except Exception as e:
             print("❌ Failed to parse LLM JSON:", e)
@@ -1,12 +1,30 @@
 import os
+import sys
 import json
+import argparse
+import subprocess
 import pandas as pd
+from tqdm import tqdm
 from llm_adapters.ollama_adapter import OllamaAdapter
 import ollama
-from utils import load_pdfs_from_attachments, confirm_fields
+from utils import load_pdfs_from_attachments, confirm_fields, collect_attachments, plan_parses, share_duplicate_parses
+from dedup import DEFAULT_NEAR_DUPLICATE_THRESHOLD, SignatureCache
+from parse_cache import ParseCache
+from lexical_index import BM25Index, shortlist_resumes
+from vector_index import VectorIndex
+from analysis_cache import AnalysisCache
+from metrics import RunMetrics
+from result_store import ResultStore, RESULT_STORE_PATH, application_id_for, full_name_for
+from work_queue import WorkQueue, WORK_QUEUE_PATH, DONE
 
 CONFIG_PATH = os.path.expanduser(".cv_config.json")
-PARSED_RESUMES_PATH = os.path.join("output", "parsed_resumes.json")
+# Upper bound on parse threads; the adapter's adaptive limiter decides how many requests are actually in flight
+DEFAULT_PARSE_WORKERS = 8
+DEFAULT_MODEL = "deepseek-r1:32b"
+# Triage scores run 1-10; candidates below this skip the full analysis
+DEFAULT_TRIAGE_MIN_SCORE = 6
+# Longest a queued run waits for one phase's tasks; null in the config waits indefinitely
+DEFAULT_QUEUE_TIMEOUT = 12 * 3600
 
 def get_rating_from_score(score: int) -> str:
     if score is None:
@@ -56,20 +74,271 @@ def save_config(config: dict):
     with open(CONFIG_PATH, "w") as f:
         json.dump(config, f, indent=2)
 
-def load_cached_resumes():
-    if os.path.exists(PARSED_RESUMES_PATH):
-        with open(PARSED_RESUMES_PATH, "r") as f:
-            return json.load(f)
-    return None
+def build_summary(entry: dict, analysis: dict) -> dict:
+    # Summary construction based on structured analysis
+    return {
+        "application_id": application_id_for(entry),
+        "full_name": full_name_for(entry['candidate']),
+        "resume_file": entry['resume_file'],
+        "analysis": analysis
+    }
+
+
+def make_backend(model_name: str, config: dict, metrics) -> OllamaAdapter:
+    return OllamaAdapter(
+        model_name=model_name,
+        host=config.get("hosts") or config.get("host"),
+        parse_model=config.get("parse_model"),
+        keep_alive=config.get("keep_alive", "30m"),
+        max_concurrency=config.get("max_concurrency", 8),
+        request_timeout=config.get("request_timeout", 600),
+        max_retries=config.get("max_retries", 3),
+        hedge_after=config.get("hedge_after"),
+        triage_model=config.get("triage_model"),
+        metrics=metrics,
+    )
+
+
+def parse_resumes(candidates_df, attachments_df, resume_dir, llm_backend, config: dict, metrics, store) -> list:
+    # Only new or changed PDFs reach the LLM
+    with metrics.stage("parse_resumes"):
+        parse_cache = ParseCache()
+        resumes_data = load_pdfs_from_attachments(
+            candidates_df,
+            attachments_df,
+            resume_dir=resume_dir,
+            llm=llm_backend,
+            max_workers=config.get("parse_workers", DEFAULT_PARSE_WORKERS),
+            cache=parse_cache,
+            extract_workers=config.get("extract_workers", os.cpu_count() or 1),
+            dedup=config.get("dedup", True),
+            near_duplicate_threshold=config.get("near_duplicate_threshold", DEFAULT_NEAR_DUPLICATE_THRESHOLD),
+            signature_cache=SignatureCache(extract_options=llm_backend.extract_options),
+        )
+    with metrics.stage("store_write"):
+        changed = store.save_parsed_resumes(resumes_data)
+    print(f"🗄️ Stored {len(resumes_data)} parsed resume(s) in `{store.path}` ({changed} new or changed).")
+    # Free the parse model before analysis so the server never holds/thrashes both
+    if llm_backend.parse_model != llm_backend.model:
+        llm_backend.release(llm_backend.parse_model)
+    removed = parse_cache.compact()
+    if removed:
+        print(f"🧹 Evicted {removed} stale parse cache entries.")
+    return resumes_data
+
+
+def build_ranking_index(resumes_data: list, llm_backend, config: dict, metrics):
+    with metrics.stage("shortlist"):
+        semantic = config.get("shortlist_mode") == "semantic"
+        if semantic and not llm_backend.supports("embed"):
+            print(f"⚠️ {type(llm_backend).__name__} can't embed text; shortlisting with BM25 instead.")
+            semantic = False
+        if semantic:
+            ranking_index = VectorIndex(llm_backend.embed, llm_backend.embed_model)
+            embedded = ranking_index.update_from_resumes(resumes_data)
+            print(f"🧭 Embedded {embedded} new or changed resume(s) with {llm_backend.embed_model}.")
+        else:
+            ranking_index = BM25Index.load()
+            ranking_index.update_from_resumes(resumes_data)
+            ranking_index.save()
+    return ranking_index
+
 
-def save_parsed_resumes(resume_data):
-    os.makedirs("output", exist_ok=True)
-    with open(PARSED_RESUMES_PATH, "w") as f:
-        json.dump(resume_data, f, indent=2)
+def shortlist_min_score(config: dict, ranking_index):
+    # BM25 scores are unbounded while cosine similarity lies in [-1, 1], so each mode has its own cut-off
+    if isinstance(ranking_index, VectorIndex):
+        return config.get("shortlist_min_similarity")
+    return config.get("shortlist_min_score")
+
+
+def select_resumes(resumes_data: list, job_description: str, ranking_index, top_k, min_score, metrics) -> list:
+    if top_k is None and min_score is None:
+        print("✅ Analyzing all resumes.")
+        return resumes_data
+    with metrics.stage("shortlist"):
+        resumes_to_analyze = shortlist_resumes(
+            resumes_data, job_description, ranking_index, top_k=top_k, min_score=min_score
+        )
+    print(f"✅ Analyzing {len(resumes_to_analyze)} of {len(resumes_data)} shortlisted resumes.")
+    return resumes_to_analyze
+
+
+def select_triaged(resumes: list, results: list, min_score, top_k) -> list:
+    """Keep resumes scoring at least min_score, best first, capped at top_k; failed screens always advance."""
+    scored = []
+    unscored = []
+    for entry, result in zip(resumes, results):
+        score = result.get("Score")
+        if not isinstance(score, (int, float)):
+            unscored.append(entry)
+        elif min_score is None or score >= min_score:
+            scored.append((score, entry))
+    # Stable sort keeps the shortlist's relevance order among equal scores
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    if top_k is not None:
+        scored = scored[:top_k]
+    return [entry for _, entry in scored] + unscored
+
+
+def record_triage(resumes: list, results: list, advanced: list, job_id: str, store) -> list:
+    advanced_ids = {id(entry) for entry in advanced}
+    store.save_triage(job_id, [(entry, result, id(entry) in advanced_ids) for entry, result in zip(resumes, results)])
+    print(f"🔎 Triage: {len(advanced)} of {len(resumes)} resume(s) advance to full analysis.")
+    return advanced
+
+
+def triage_resumes(llm_backend, resumes: list, job_description: str, store, analysis_cache, config: dict, metrics, job_name: str = None) -> list:
+    """
+    Screen resumes with the cheap score-and-reason pass and return the ones worth a
+    full analysis. A no-op unless config["triage"] is set.
+    """
+    if not config.get("triage") or not resumes:
+        return resumes
+    llm_backend.preload(llm_backend.triage_model)
+
+    results = [None] * len(resumes)
+    cache_keys = [analysis_cache.key_for(entry['parsed_resume'], job_description, llm_backend, kind="triage") for entry in resumes]
+    # Indices still to screen, grouped so duplicate parses share one request
+    pending = {}
+    for i, cache_key in enumerate(cache_keys):
+        results[i] = analysis_cache.get(cache_key)
+        if results[i] is None:
+            pending.setdefault(cache_key, []).append(i)
+    pending_keys = list(pending)
+
+    with metrics.stage("triage"):
+        batch = llm_backend.triage_many(
+            [resumes[pending[key][0]]['parsed_resume'] for key in pending_keys],
+            job_description,
+            max_workers=config.get("analysis_workers", 4),
+        )
+        for n, result, error in batch:
+            cache_key = pending_keys[n]
+            if error is None:
+                analysis_cache.put(cache_key, result)
+            for i in pending[cache_key]:
+                results[i] = {"error": str(error)} if error is not None else result
+
+    advanced = select_triaged(
+        resumes, results, config.get("triage_min_score", DEFAULT_TRIAGE_MIN_SCORE), config.get("triage_top_k")
+    )
+    return record_triage(resumes, results, advanced, store.add_job(job_description, job_name), store)
+
+
+def release_triage_model(llm_backend, config: dict):
+    # Free the small model before the full analysis so the two never thrash
+    if config.get("triage") and llm_backend.triage_model != llm_backend.model:
+        llm_backend.release(llm_backend.triage_model)
+
+
+def run_analysis(
+    llm_backend,
+    resumes_to_analyze: list,
+    job_description: str,
+    store,
+    analysis_cache,
+    metrics,
+    job_name: str = None,
+    commit_every: int = 10,
+    max_workers: int = 1,
+    verbose: bool = True,
+) -> str:
+    """
+    Analyze resumes against one job description, committing summaries to the result
+    store in batches and skipping application IDs already completed for that job.
+
+    Returns:
+        str: The job's ID in the result store.
+    """
+    job_id = store.add_job(job_description, job_name)
+    done_ids = store.completed_ids(job_id)
+    pending = [entry for entry in resumes_to_analyze if application_id_for(entry) not in done_ids]
+    if len(pending) < len(resumes_to_analyze):
+        print(f"\n⏩ Resuming: {len(resumes_to_analyze) - len(pending)} resume(s) already analyzed for job {job_id}.")
+
+    if pending:
+        llm_backend.preload(llm_backend.model)
+
+    hits = []
+    # Duplicate attachments share a parse and so a cache key; each key is analyzed once
+    misses = {}
+    for entry in pending:
+        cache_key = analysis_cache.key_for(entry['parsed_resume'], job_description, llm_backend)
+        cached = analysis_cache.get(cache_key)
+        if cached is None:
+            misses.setdefault(cache_key, []).append(entry)
+        else:
+            hits.append((entry, cached))
+    miss_keys = list(misses)
+
+    def completed():
+        # Cache hits first, then LLM results as the batch finishes them
+        yield from hits
+        batch = llm_backend.analyze_many(
+            [(misses[key][0]['parsed_resume'], misses[key][0]['candidate']) for key in miss_keys],
+            job_description,
+            max_workers=max_workers,
+        )
+        for n, result, error in batch:
+            cache_key = miss_keys[n]
+            if error is not None:
+                for entry in misses[cache_key]:
+                    print(f"❌ Analysis failed for {entry['resume_file']}: {error}")
+                continue
+            analysis_cache.put(cache_key, result)
+            for entry in misses[cache_key]:
+                yield entry, result
+
+    with metrics.stage("analysis"), store.writer(job_id, commit_every=commit_every) as writer:
+        for entry, result in completed():
+            if verbose:
+                print(f"\n📌 Analysis for {entry['resume_file']}:")
+                print(json.dumps(result, indent=2))
+
+            # Store the candidate-focused summary as soon as it completes
+            writer.write(build_summary(entry, result))
+
+    return job_id
+
+
+def report_run(llm_backend, analysis_cache, metrics):
+    print(f"💾 Analysis cache: {analysis_cache.hits} hit(s), {analysis_cache.misses} miss(es).")
+    prompt_summary = llm_backend.prompt_stats.summary()
+    if prompt_summary["requests"]:
+        print(
+            f"⚡ Prompt eval: {prompt_summary['avg_prompt_eval_ms']} ms/request, "
+            f"~{prompt_summary['avg_saved_ms']} ms/request saved by prefix reuse "
+            f"(~{prompt_summary['avg_reused_tokens']} cached tokens/request)."
+        )
+    analysis_cache.compact()
+    events = metrics.counters
+    if events:
+        print(
+            f"🔁 LLM calls: {events.get('llm_retries', 0)} retried, {events.get('llm_timeouts', 0)} timed out, "
+            f"{events.get('llm_hedges', 0)} hedged ({events.get('llm_hedge_wins', 0)} hedge wins); "
+            f"final concurrency limit {llm_backend.controller.limiter.limit}."
+        )
+    llm_totals = metrics.report()["llm"]
+    if "triage" in llm_totals:
+        print(
+            f"🧮 Generated tokens: {llm_totals['triage']['eval_count']} in {llm_totals['triage']['requests']} triage request(s), "
+            f"{llm_totals.get('analyze', {}).get('eval_count', 0)} in {llm_totals.get('analyze', {}).get('requests', 0)} full analyses."
+        )
+    host_stats = llm_backend.pool.stats()
+    if len(host_stats) > 1:
+        for host, stats in host_stats.items():
+            print(
+                f"🖥️ {host}: {stats['requests']} request(s), {stats['errors']} error(s), "
+                f"{stats['mean_ms']} ms mean, ejected {stats['ejections']} time(s)."
+            )
+
+    metrics.export("output")
+    print("📈 Run report written to `output/run_report.json` and `output/metrics.prom`.")
 
 
 def main():
     print("📂 Welcome to the CV Analyzer CLI Tool")
+    metrics = RunMetrics(profile=load_config().get("profile", False))
 
     # Step 1: Get paths from config or prompt
     resume_dir = get_or_ask_path("resume_dir", "Enter path to the folder containing resumes (PDFs)", is_file=False)
@@ -78,8 +347,9 @@ def main():
 
     # Step 2: Load data
     print("\n🔄 Loading CSVs...")
-    candidates_df = pd.read_csv(candidate_csv_path)
-    attachments_df = pd.read_csv(attachment_csv_path)
+    with metrics.stage("csv_load"):
+        candidates_df = pd.read_csv(candidate_csv_path)
+        attachments_df = pd.read_csv(attachment_csv_path)
 
     # Step 3: Confirm columns to use
     candidate_fields = confirm_fields(candidates_df, "candidate")
@@ -88,9 +358,10 @@ def main():
     # Step 4: Set up LLM backend (Ollama)
     print("\n🔄 Setting up LLM backend..."
           "\nAvailable models:")
-    # List available models
+    # List available models (one round-trip, reused for the selection below)
+    available_models = ollama.list().models
     k = 1
-    for i in ollama.list().models:
+    for i in available_models:
         print(k,". ", i.model, end=" ", sep="")
         # size=17396936941 print in human readable format
         print(i.size.human_readable(True))
@@ -100,96 +371,414 @@ def main():
     model_index = input("Select a model by number (or press Enter for default): ").strip()
     if model_index.isdigit():
         model_index = int(model_index)
-        if 0 < model_index <= len(ollama.list().models):
-            model_name = ollama.list().models[model_index - 1].model
+        if 0 < model_index <= len(available_models):
+            model_name = available_models[model_index - 1].model
             print(f"🔄 Using selected model: {model_name}")
         else:
             print("❌ Invalid selection. Using default model.")
-            model_name = "deepseek-r1:32b"
+            model_name = DEFAULT_MODEL
     else:
-        model_name = "deepseek-r1:32b"
-        print("🔄 Using default model: deepseek-r1:32b")
+        model_name = DEFAULT_MODEL
+        print(f"🔄 Using default model: {DEFAULT_MODEL}")
     
-    llm_backend = OllamaAdapter(model_name="deepseek-r1:32b")
-
-    # Step 5: Process resumes
-    resumes_data = None
-    if os.path.exists(PARSED_RESUMES_PATH):
-        reuse = input("\n🔄 Cached parsed resumes found. Reparse all PDFs? (y/n): ").strip().lower()
-        if reuse == 'n':
-            print("✅ Using cached parsed resume data.")
-            resumes_data = load_cached_resumes()
-    if not resumes_data:
-        print("\n📄 Parsing resumes with LLM...")
-        resumes_data = load_pdfs_from_attachments(
-            candidates_df[candidate_fields],
-            attachments_df[attachment_fields],
-            resume_dir=resume_dir,
-            llm=llm_backend
-        )
-        save_parsed_resumes(resumes_data)
-        print("💾 Parsed resumes cached to reuse in future runs.")
+    llm_backend = make_backend(model_name, load_config(), metrics)
 
-
-    # Step 6: Select how many resumes to analyze
-    total_resumes = len(resumes_data)
-    print(f"\n📊 Total resumes parsed: {total_resumes}")
-    subset_input = input("Enter how many resumes to analyze (or press Enter to analyze all): ").strip()
-
-    if subset_input.isdigit():
-        subset_count = int(subset_input)
-        if subset_count < total_resumes:
-            resumes_to_analyze = resumes_data[:subset_count]
-            print(f"✅ Analyzing first {subset_count} resumes.")
-        else:
-            resumes_to_analyze = resumes_data
-            print("⚠️ Requested count exceeds available resumes. Analyzing all.")
-    else:
-        resumes_to_analyze = resumes_data
-        print("✅ Analyzing all resumes.")
-
-    # Step 7: Get job description and analyze
+    # Step 5: Process resumes (only new or changed PDFs reach the LLM)
+    print("\n📄 Parsing resumes with LLM...")
+    config = load_config()
+    store = ResultStore(config.get("store_path", RESULT_STORE_PATH))
+    resumes_data = parse_resumes(
+        candidates_df[candidate_fields],
+        attachments_df[attachment_fields],
+        resume_dir,
+        llm_backend,
+        config,
+        metrics,
+        store
+    )
+
+    # Step 6: Get job description and shortlist by relevance (BM25 or embeddings)
+    print(f"\n📊 Total resumes parsed: {len(resumes_data)}")
     job_description = input("\n📝 Enter job description for evaluation: ").strip()
-
+    ranking_index = build_ranking_index(resumes_data, llm_backend, config, metrics)
+
+    subset_input = input("Enter how many top-ranked resumes to analyze (or press Enter to analyze all): ").strip()
+    top_k = int(subset_input) if subset_input.isdigit() else None
+    resumes_to_analyze = select_resumes(
+        resumes_data, job_description, ranking_index, top_k, shortlist_min_score(config, ranking_index), metrics
+    )
+    analysis_cache = AnalysisCache()
+    resumes_to_analyze = triage_resumes(
+        llm_backend, resumes_to_analyze, job_description, store, analysis_cache, config, metrics
+    )
+    release_triage_model(llm_backend, config)
+
+    # Step 7 & 8: Analyze shortlisted resumes, committing each summary to the result store
     print("\n📊 Generating analysis...")
-    
-    # Sample function to call your LLM backend and analyze resume
-    # Assuming `llm_backend.analyze_resume_against_job` returns the structured JSON schema as required
-    for entry in resumes_to_analyze:
-        result = llm_backend.analyze_resume_against_job(
-            resume_data=entry['parsed_resume'],
-            candidate_meta=entry['candidate'],
-            job_description=job_description
+    job_id = run_analysis(
+        llm_backend,
+        resumes_to_analyze,
+        job_description,
+        store,
+        analysis_cache,
+        metrics,
+        commit_every=config.get("commit_every", 10),
+        max_workers=config.get("analysis_workers", 1)
+    )
+
+    print(f"\n✅ Summarized results saved to `{store.path}` (job {job_id}). Top candidates:")
+    for summary in store.iter_analyses(job_id, limit=5):
+        score = (summary["analysis"].get("Overall Match Assessment") or {}).get("Score")
+        print(f"   {score}/10  {summary['full_name']} ({summary['application_id']})")
+    report_run(llm_backend, analysis_cache, metrics)
+    llm_backend.close()
+    store.close()
+
+
+def start_local_workers(batch_config_path: str, count: int) -> list:
+    worker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+    return [subprocess.Popen([sys.executable, worker_script, "--config", batch_config_path]) for _ in range(count)]
+
+
+def wait_for_tasks(queue, kind: str, keys: list, metrics, config: dict, workers: list) -> dict:
+    """
+    Wait for queued tasks, failing fast once every local worker has exited or after
+    config["queue_timeout"] seconds. Without local workers, remote ones are trusted
+    to show up and only the timeout applies.
+    """
+    print(f"⏳ Waiting for {len(keys)} {kind} task(s) on `{queue.path}`...")
+    timeout = config.get("queue_timeout", DEFAULT_QUEUE_TIMEOUT)
+
+    def alive():
+        return any(worker.poll() is None for worker in workers)
+
+    with metrics.stage(f"queue_{kind}"), tqdm(total=len(keys)) as bar:
+        finished = queue.wait_for(
+            keys,
+            poll_interval=config.get("poll_interval", 1.0),
+            timeout=timeout,
+            progress=lambda done: bar.update(done - bar.n),
+            alive=alive if workers else None,
         )
-        entry['analysis'] = result
-        print(f"\n📌 Analysis for {entry['resume_file']}:")
-        print(json.dumps(result, indent=2))
-
-    # Step 8: Create candidate-focused summary
-    output_summary = []
-
-    for entry in resumes_to_analyze:
-        candidate = entry['candidate']
-        analysis = entry['analysis']
-
-        # Extract candidate info
-        application_id = candidate.get("Application Id") or candidate.get("Application ID")
-        full_name = candidate.get("Full Name") or f"{candidate.get('First Name', '')} {candidate.get('Last Name', '')}".strip()
-
-        # Summary construction based on structured analysis
-        summary = {
-            "application_id": application_id,
-            "full_name": full_name,
-            "analysis": analysis
+    if not finished:
+        reason = "every local worker exited" if workers and not alive() else f"not finished after {timeout}s"
+        raise RuntimeError(f"{kind} tasks on `{queue.path}`: {reason}; rerun to pick up where this left off.")
+    return queue.results(keys)
+
+
+def parse_resumes_queued(candidates_df, attachments_df, resume_dir, llm_backend, queue, config: dict, metrics, store, workers: list) -> list:
+    """Enqueue one parse task per distinct uncached resume file, wait for the workers, then join the results."""
+    attachments = collect_attachments(candidates_df, attachments_df, resume_dir)
+    plan = plan_parses(
+        attachments,
+        llm_backend,
+        ParseCache(),
+        config.get("dedup", True),
+        config.get("near_duplicate_threshold", DEFAULT_NEAR_DUPLICATE_THRESHOLD),
+        workers=config.get("extract_workers", os.cpu_count() or 1),
+        signature_cache=SignatureCache(extract_options=llm_backend.extract_options),
+    )
+    entries = [None] * len(attachments)
+    for i, parsed_resume in plan["cached"].items():
+        pdf_name, _, candidate_meta = attachments[i]
+        entries[i] = {"resume_file": pdf_name, "candidate": candidate_meta, "parsed_resume": parsed_resume}
+    keys = {}
+    tasks = {}
+    for i in plan["pending"]:
+        cache_key = plan["cache_keys"][i]
+        keys[i] = f"parse:{cache_key}"
+        # Absolute paths so workers started elsewhere find the same files
+        tasks[keys[i]] = {"pdf_path": os.path.abspath(attachments[i][1]), "cache_key": cache_key}
+    added = queue.enqueue_many("parse", tasks.items())
+    print(f"📥 Queued {added} new parse task(s) for {len(tasks)} distinct uncached resume(s).")
+
+    results = wait_for_tasks(queue, "parse", list(tasks), metrics, config, workers) if tasks else {}
+    failed = []
+    for i, key in keys.items():
+        pdf_name, _, candidate_meta = attachments[i]
+        outcome = results.get(key)
+        if outcome is None or outcome["status"] != DONE:
+            failed.append(pdf_name)
+            continue
+        entries[i] = {"resume_file": pdf_name, "candidate": candidate_meta, "parsed_resume": outcome["result"]}
+    failed += share_duplicate_parses(
+        attachments, entries, plan["duplicates"], llm_backend.extract_options, workers=config.get("extract_workers", os.cpu_count() or 1)
+    )
+    resumes_data = [entry for entry in entries if entry is not None]
+    if failed:
+        print(f"⚠️ {len(failed)} resume(s) failed to parse and were skipped.")
+
+    with metrics.stage("store_write"):
+        changed = store.save_parsed_resumes(resumes_data)
+    print(f"🗄️ Stored {len(resumes_data)} parsed resume(s) in `{store.path}` ({changed} new or changed).")
+    return resumes_data
+
+
+def enqueue_analyses(llm_backend, resumes_to_analyze: list, job_description: str, store, queue, analysis_cache, job_name: str = None) -> dict:
+    job_id = store.add_job(job_description, job_name)
+    done_ids = store.completed_ids(job_id)
+    pending = [entry for entry in resumes_to_analyze if application_id_for(entry) not in done_ids]
+    if len(pending) < len(resumes_to_analyze):
+        print(f"⏩ Resuming: {len(resumes_to_analyze) - len(pending)} resume(s) already analyzed for job {job_id}.")
+    keys = []
+    tasks = {}
+    for entry in pending:
+        cache_key = analysis_cache.key_for(entry['parsed_resume'], job_description, llm_backend)
+        keys.append(f"analyze:{cache_key}")
+        tasks[keys[-1]] = {
+            "parsed_resume": entry['parsed_resume'],
+            "candidate": entry['candidate'],
+            "job_description": job_description,
+            "cache_key": cache_key,
+        }
+    queue.enqueue_many("analyze", tasks.items())
+    return {"job_id": job_id, "entries": pending, "keys": keys}
+
+
+def enqueue_triage(llm_backend, resumes: list, job_description: str, queue, analysis_cache) -> list:
+    keys = []
+    tasks = {}
+    for entry in resumes:
+        cache_key = analysis_cache.key_for(entry['parsed_resume'], job_description, llm_backend, kind="triage")
+        keys.append(f"triage:{cache_key}")
+        tasks[keys[-1]] = {"parsed_resume": entry['parsed_resume'], "job_description": job_description, "cache_key": cache_key}
+    queue.enqueue_many("triage", tasks.items())
+    return keys
+
+
+def collect_analyses(batch: dict, results: dict, store, metrics) -> str:
+    summaries = []
+    failed = 0
+    for entry, key in zip(batch["entries"], batch["keys"]):
+        outcome = results.get(key)
+        if outcome is None or outcome["status"] != DONE:
+            failed += 1
+            continue
+        summaries.append(build_summary(entry, outcome["result"]))
+    if failed:
+        print(f"⚠️ {failed} analysis task(s) failed for job {batch['job_id']}; they are retried on the next run.")
+    with metrics.stage("store_write"):
+        store.save_analyses(batch["job_id"], summaries)
+    return batch["job_id"]
+
+
+def load_batch_jobs(batch_config: dict, job_files: list) -> list:
+    jobs = []
+    for job in batch_config.get("jobs", []):
+        if "file" in job:
+            with open(job["file"], "r") as f:
+                description = f.read()
+            name = job.get("name") or os.path.splitext(os.path.basename(job["file"]))[0]
+        else:
+            description = job["description"]
+            name = job.get("name") or f"job_{len(jobs) + 1}"
+        jobs.append({"name": name, "description": description.strip(), "top_k": job.get("top_k")})
+    for path in job_files:
+        with open(path, "r") as f:
+            jobs.append({"name": os.path.splitext(os.path.basename(path))[0], "description": f.read().strip()})
+    return jobs
+
+
+def run_batch(batch_config_path: str, job_files: list):
+    """
+    Non-interactive mode: score every resume against every job description.
+
+    Resumes are parsed once, then the resume × job matrix is scheduled job by job
+    so consecutive requests share the static-instructions + job-description prompt
+    prefix. Results go to the SQLite result store and are exported to one JSONL
+    file per job.
+
+    The config needs resume_dir, candidate_csv and attachment_csv, and may set
+    jobs ([{"name", "description" | "file", "top_k"}]), model, host, top_k,
+    hosts, parse_model, keep_alive, max_concurrency, request_timeout, max_retries,
+    hedge_after, shortlist_mode, shortlist_min_score (BM25), shortlist_min_similarity
+    (semantic), triage, triage_model, triage_min_score, triage_top_k,
+    candidate_fields, attachment_fields,
+    parse_workers, extract_workers, analysis_workers, commit_every, store_path
+    and results_dir.
+
+    With "queue": true, parsing and analysis become tasks on a durable work
+    queue (queue_path, lease_seconds, max_attempts) run by worker.py processes;
+    this process only enqueues and collects. It starts local_workers of them
+    itself (default 1); more can be started anywhere that shares the output
+    directory.
+    """
+    with open(batch_config_path, "r") as f:
+        config = json.load(f)
+    jobs = load_batch_jobs(config, job_files)
+    if not jobs:
+        print("❌ No job descriptions given (use 'jobs' in the config or --jobs).")
+        sys.exit(1)
+
+    metrics = RunMetrics(profile=config.get("profile", False))
+    print(f"📂 Batch run: {len(jobs)} job description(s)")
+
+    with metrics.stage("csv_load"):
+        candidates_df = pd.read_csv(config["candidate_csv"])
+        attachments_df = pd.read_csv(config["attachment_csv"])
+    candidate_fields = config.get("candidate_fields") or candidates_df.columns.tolist()
+    attachment_fields = config.get("attachment_fields") or attachments_df.columns.tolist()
+
+    llm_backend = make_backend(config.get("model", DEFAULT_MODEL), config, metrics)
+    store = ResultStore(config.get("store_path", RESULT_STORE_PATH))
+    if config.get("queue"):
+        run_batch_queued(batch_config_path, config, jobs, candidates_df[candidate_fields],
+                         attachments_df[attachment_fields], llm_backend, store, metrics)
+        return
+
+    print("\n📄 Parsing resumes with LLM...")
+    resumes_data = parse_resumes(
+        candidates_df[candidate_fields],
+        attachments_df[attachment_fields],
+        config["resume_dir"],
+        llm_backend,
+        config,
+        metrics,
+        store
+    )
+    print(f"\n📊 Total resumes parsed: {len(resumes_data)}")
+    ranking_index = build_ranking_index(resumes_data, llm_backend, config, metrics)
+
+    # Shortlist and triage every job first so the triage and analysis models each load once
+    analysis_cache = AnalysisCache()
+    shortlists = {}
+    for job in jobs:
+        print(f"\n📝 Job: {job['name']}")
+        resumes_to_analyze = select_resumes(
+            resumes_data,
+            job["description"],
+            ranking_index,
+            job.get("top_k") or config.get("top_k"),
+            shortlist_min_score(config, ranking_index),
+            metrics
+        )
+        shortlists[job["name"]] = triage_resumes(
+            llm_backend, resumes_to_analyze, job["description"], store, analysis_cache, config, metrics, job_name=job["name"]
+        )
+    release_triage_model(llm_backend, config)
+
+    results_dir = config.get("results_dir", os.path.join("output", "batch"))
+    written = {}
+    for job in jobs:
+        print(f"\n📊 Analyzing job: {job['name']}")
+        job_id = run_analysis(
+            llm_backend,
+            shortlists[job["name"]],
+            job["description"],
+            store,
+            analysis_cache,
+            metrics,
+            job_name=job["name"],
+            commit_every=config.get("commit_every", 10),
+            max_workers=config.get("analysis_workers", 4),
+            verbose=False
+        )
+        with metrics.stage("export"):
+            written[job["name"]] = store.export_jsonl(job_id, results_dir, name=job["name"])
+
+    print("\n✅ Batch results:")
+    for name, path in written.items():
+        print(f"   {name}: {path}")
+    report_run(llm_backend, analysis_cache, metrics)
+    llm_backend.close()
+    store.close()
+
+
+def run_batch_queued(batch_config_path: str, config: dict, jobs: list, candidates_df, attachments_df, llm_backend, store, metrics):
+    queue = WorkQueue(
+        config.get("queue_path", WORK_QUEUE_PATH),
+        lease_seconds=config.get("lease_seconds", 120),
+        max_attempts=config.get("max_attempts", 3),
+    )
+    workers = start_local_workers(batch_config_path, config.get("local_workers", 1))
+    try:
+        print("\n📄 Queueing resume parsing...")
+        resumes_data = parse_resumes_queued(
+            candidates_df, attachments_df, config["resume_dir"], llm_backend, queue, config, metrics, store, workers
+        )
+        print(f"\n📊 Total resumes parsed: {len(resumes_data)}")
+        ranking_index = build_ranking_index(resumes_data, llm_backend, config, metrics)
+
+        # Queue every job up front (grouped by job, so workers still share prompt
+        # prefixes) and only then wait, so no worker idles between jobs
+        analysis_cache = AnalysisCache()
+        shortlists = {}
+        for job in jobs:
+            print(f"\n📝 Job: {job['name']}")
+            shortlists[job["name"]] = select_resumes(
+                resumes_data,
+                job["description"],
+                ranking_index,
+                job.get("top_k") or config.get("top_k"),
+                shortlist_min_score(config, ranking_index),
+                metrics
+            )
+
+        if config.get("triage"):
+            triage_keys = {
+                job["name"]: enqueue_triage(llm_backend, shortlists[job["name"]], job["description"], queue, analysis_cache)
+                for job in jobs
+            }
+            results = wait_for_tasks(
+                queue, "triage", [key for keys in triage_keys.values() for key in keys], metrics, config, workers
+            )
+            for job in jobs:
+                resumes = shortlists[job["name"]]
+                screened = [
+                    (results.get(key) or {}).get("result") or {"error": (results.get(key) or {}).get("error")}
+                    for key in triage_keys[job["name"]]
+                ]
+                advanced = select_triaged(
+                    resumes, screened, config.get("triage_min_score", DEFAULT_TRIAGE_MIN_SCORE), config.get("triage_top_k")
+                )
+                print(f"\n📝 Job: {job['name']}")
+                shortlists[job["name"]] = record_triage(
+                    resumes, screened, advanced, store.add_job(job["description"], job["name"]), store
+                )
+
+        batches = {
+            job["name"]: enqueue_analyses(
+                llm_backend, shortlists[job["name"]], job["description"], store, queue, analysis_cache, job_name=job["name"]
+            )
+            for job in jobs
         }
 
-        output_summary.append(summary)
-
-    # Save to final JSON
-    os.makedirs("output", exist_ok=True)
-    with open("output/analysis_results.json", "w") as f:
-        json.dump(output_summary, f, indent=2)
-
-    print("\n✅ Final summarized results saved to `output/analysis_results.json`")
-
-main()
\ No newline at end of file
+        keys = [key for batch in batches.values() for key in batch["keys"]]
+        results = wait_for_tasks(queue, "analyze", keys, metrics, config, workers)
+        results_dir = config.get("results_dir", os.path.join("output", "batch"))
+        written = {}
+        for name, batch in batches.items():
+            job_id = collect_analyses(batch, results, store, metrics)
+            with metrics.stage("export"):
+                written[name] = store.export_jsonl(job_id, results_dir, name=name)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+    print("\n✅ Batch results:")
+    for name, path in written.items():
+        print(f"   {name}: {path}")
+    print(f"📬 Queue: {queue.counts()}")
+    metrics.export("output")
+    print("📈 Run report written to `output/run_report.json` and `output/metrics.prom`.")
+    queue.close()
+    llm_backend.close()
+    store.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CV Analyzer: parse resumes and score them against job descriptions.")
+    parser.add_argument("--batch", metavar="CONFIG", help="Run non-interactively using this JSON batch config")
+    parser.add_argument("--jobs", nargs="*", default=[], metavar="FILE", help="Job description text files (batch mode)")
+    return parser.parse_args(argv)
+
+
+# Guarded so extraction worker processes (spawn start method) don't re-run the CLI
+if __name__ == "__main__":
+    args = parse_args()
+    if args.batch:
+        run_batch(args.batch, args.jobs)
+    else:
+        main()
@@ -0,0 +1,254 @@
+import io
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+class PromptEvalStats:
+    """
+    Tracks Ollama prompt-eval counters to estimate KV prefix-cache savings.
+
+    Ollama's prompt_eval_count only covers tokens it actually evaluated, so a
+    request that reused a cached prefix reports fewer tokens than its prompt
+    holds. The densest tokens-per-char ratio observed (a cold request) estimates
+    each prompt's full size; the shortfall, at that request's eval rate, is the
+    time saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []  # (prompt_chars, prompt_eval_count, prompt_eval_duration_ns)
+
+    def record(self, prompt_chars: int, response):
+        count = response.get("prompt_eval_count") or 0
+        duration = response.get("prompt_eval_duration") or 0
+        if not count or not prompt_chars:
+            return
+        with self._lock:
+            self.samples.append((prompt_chars, count, duration))
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = list(self.samples)
+        if not samples:
+            return {"requests": 0}
+
+        tokens_per_char = max(count / chars for chars, count, _ in samples)
+        saved_tokens = 0.0
+        saved_ns = 0.0
+        for chars, count, duration in samples:
+            reused = max(0.0, chars * tokens_per_char - count)
+            saved_tokens += reused
+            saved_ns += reused * duration / count
+
+        n = len(samples)
+        return {
+            "requests": n,
+            "avg_prompt_eval_tokens": round(sum(c for _, c, _ in samples) / n, 1),
+            "avg_prompt_eval_ms": round(sum(d for _, _, d in samples) / n / 1e6, 1),
+            "avg_reused_tokens": round(saved_tokens / n, 1),
+            "avg_saved_ms": round(saved_ns / n / 1e6, 1),
+        }
+
+
+LLM_COUNTERS = (
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+    "load_duration",
+    "total_duration",
+)
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+class RunMetrics:
+    """
+    Per-stage wall-clock timings and Ollama token counters for one run.
+
+    Stages are timed with `with metrics.stage("name"):` (or `observe` for
+    durations measured elsewhere, e.g. in worker processes) and LLM responses are
+    fed to `record_llm`. `export` writes a JSON run report and a Prometheus
+    text-format file. With profile=True, each top-level stage also gets a
+    cProfile dump and a tracemalloc allocation diff.
+    """
+
+    def __init__(self, profile: bool = False, profile_dir: str = os.path.join("output", "profile")):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}  # name -> list of seconds
+        self.llm = {}  # kind -> {"requests": n, counter: total}
+        self.counters = {}  # event -> count (retries, timeouts, hedges, ...)
+        self.hosts = {}  # LLM host -> {"requests", "errors", "seconds"}
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self._profile_lock = threading.Lock()
+        self._profilers = {}
+        self._alloc_diffs = {}
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self.stages.setdefault(name, []).append(seconds)
+
+    def increment(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_host(self, host: str, seconds: float, ok: bool):
+        with self._lock:
+            totals = self.hosts.setdefault(host, {"requests": 0, "errors": 0, "seconds": 0.0})
+            totals["requests"] += 1
+            totals["errors"] += 0 if ok else 1
+            totals["seconds"] += seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        # Only one stage is profiled at a time; nested/concurrent stages are just timed
+        profiling = self.profile and self._profile_lock.acquire(blocking=False)
+        if profiling:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            profiler = self._profilers.setdefault(name, cProfile.Profile())
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+            if profiling:
+                profiler.disable()
+                self._alloc_diffs[name] = tracemalloc.take_snapshot().compare_to(before, "lineno")[:15]
+                self._profile_lock.release()
+
+    def record_llm(self, kind: str, response):
+        with self._lock:
+            totals = self.llm.setdefault(kind, {"requests": 0, **{c: 0 for c in LLM_COUNTERS}})
+            totals["requests"] += 1
+            for counter in LLM_COUNTERS:
+                totals[counter] += response.get(counter) or 0
+
+    def report(self) -> dict:
+        with self._lock:
+            stages = {name: list(samples) for name, samples in self.stages.items()}
+            llm = {kind: dict(totals) for kind, totals in self.llm.items()}
+            counters = dict(self.counters)
+            hosts = {host: dict(totals) for host, totals in self.hosts.items()}
+
+        stage_report = {
+            name: {
+                "calls": len(samples),
+                "total_s": round(sum(samples), 3),
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 1),
+                "p50_ms": round(_percentile(samples, 50) * 1000, 1),
+                "p95_ms": round(_percentile(samples, 95) * 1000, 1),
+                "max_ms": round(max(samples) * 1000, 1),
+            }
+            for name, samples in stages.items()
+        }
+        for totals in llm.values():
+            eval_s = totals["eval_duration"] / 1e9
+            prompt_s = totals["prompt_eval_duration"] / 1e9
+            totals["eval_tokens_per_s"] = round(totals["eval_count"] / eval_s, 1) if eval_s else 0.0
+            totals["prompt_tokens_per_s"] = round(totals["prompt_eval_count"] / prompt_s, 1) if prompt_s else 0.0
+
+        return {
+            "started_at": self.started,
+            "wall_s": round(time.time() - self.started, 3),
+            "stages": stage_report,
+            "llm": llm,
+            "counters": counters,
+            "hosts": {
+                host: {**t, "seconds": round(t["seconds"], 3), "mean_ms": round(t["seconds"] / t["requests"] * 1000, 1)}
+                for host, t in hosts.items()
+            },
+        }
+
+    def to_prometheus(self, prefix: str = "resume_parser") -> str:
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Wall-clock seconds spent per pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {s["total_s"]}' for name, s in report["stages"].items()]
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Number of times each stage ran.",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {s["calls"]}' for name, s in report["stages"].items()]
+        lines += [
+            f"# HELP {prefix}_llm_requests_total LLM requests per kind.",
+            f"# TYPE {prefix}_llm_requests_total counter",
+        ]
+        lines += [f'{prefix}_llm_requests_total{{kind="{kind}"}} {t["requests"]}' for kind, t in report["llm"].items()]
+        lines += [
+            f"# HELP {prefix}_llm_tokens_total Tokens evaluated by the LLM.",
+            f"# TYPE {prefix}_llm_tokens_total counter",
+        ]
+        for kind, t in report["llm"].items():
+            lines.append(f'{prefix}_llm_tokens_total{{kind="{kind}",phase="prompt"}} {t["prompt_eval_count"]}')
+            lines.append(f'{prefix}_llm_tokens_total{{kind="{kind}",phase="generation"}} {t["eval_count"]}')
+        lines += [
+            f"# HELP {prefix}_llm_seconds_total Server-reported LLM time.",
+            f"# TYPE {prefix}_llm_seconds_total counter",
+        ]
+        for kind, t in report["llm"].items():
+            for phase, counter in (("prompt", "prompt_eval_duration"), ("generation", "eval_duration"), ("load", "load_duration"), ("total", "total_duration")):
+                lines.append(f'{prefix}_llm_seconds_total{{kind="{kind}",phase="{phase}"}} {t[counter] / 1e9}')
+        lines += [
+            f"# HELP {prefix}_llm_tokens_per_second Generation throughput.",
+            f"# TYPE {prefix}_llm_tokens_per_second gauge",
+        ]
+        lines += [f'{prefix}_llm_tokens_per_second{{kind="{kind}"}} {t["eval_tokens_per_s"]}' for kind, t in report["llm"].items()]
+        lines += [
+            f"# HELP {prefix}_events_total Counted events such as LLM retries, timeouts and hedges.",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {n}' for name, n in report["counters"].items()]
+        lines += [
+            f"# HELP {prefix}_host_requests_total LLM requests per backend host and outcome.",
+            f"# TYPE {prefix}_host_requests_total counter",
+        ]
+        for host, t in report["hosts"].items():
+            lines.append(f'{prefix}_host_requests_total{{host="{host}",outcome="ok"}} {t["requests"] - t["errors"]}')
+            lines.append(f'{prefix}_host_requests_total{{host="{host}",outcome="error"}} {t["errors"]}')
+        lines += [
+            f"# HELP {prefix}_host_seconds_total Seconds spent in requests per backend host.",
+            f"# TYPE {prefix}_host_seconds_total counter",
+        ]
+        lines += [f'{prefix}_host_seconds_total{{host="{host}"}} {t["seconds"]}' for host, t in report["hosts"].items()]
+        return "\n".join(lines) + "\n"
+
+    def _write_profiles(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        for name, profiler in self._profilers.items():
+            profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+            out.write("\nTop allocations (tracemalloc, last call):\n")
+            for stat in self._alloc_diffs.get(name, []):
+                out.write(f"{stat}\n")
+            with open(os.path.join(self.profile_dir, f"{name}.txt"), "w") as f:
+                f.write(out.getvalue())
+
+    def export(self, output_dir: str = "output") -> dict:
+        os.makedirs(output_dir, exist_ok=True)
+        report = self.report()
+        with open(os.path.join(output_dir, "run_report.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        with open(os.path.join(output_dir, "metrics.prom"), "w") as f:
+            f.write(self.to_prometheus())
+        if self.profile:
+            self._write_profiles()
+        return report
@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import hashlib
+from typing import Optional
+
+PARSE_CACHE_DIR = os.path.join("output", "parse_cache")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed resumes, one JSON file per entry.
+
+    Entries are keyed on the PDF content hash, the model name and the adapter's
+    parse prompt/schema version, so renamed files still hit and edited files,
+    new models or prompt changes miss.
+    """
+
+    def __init__(self, cache_dir: str = PARSE_CACHE_DIR, max_entries: int = 10000, max_age_days: int = 90):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, pdf_path: str, llm, digest: Optional[str] = None) -> str:
+        # digest: the file's sha256 when the caller already has it
+        model = getattr(llm, "parse_model", None) or getattr(llm, "model", type(llm).__name__)
+        version = getattr(llm, "parse_version", "")
+        budget = getattr(llm, "parse_token_budget", "")
+        raw = f"{digest or file_sha256(pdf_path)}|{model}|{version}|{budget}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # Refresh mtime so compaction treats this entry as recently used
+        os.utime(path, None)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: dict):
+        # Failed parses are not cached so they get retried next run
+        if "error" in value:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def compact(self) -> int:
+        """
+        Drop entries older than max_age_days, then the least recently used ones
+        beyond max_entries. Returns the number of removed entries.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith(".json"):
+                entries.append((os.path.getmtime(path), path))
+            elif name.endswith(".tmp"):
+                os.remove(path)
+
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.max_age_days * 86400
+        removed = 0
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.max_entries or mtime < cutoff:
+                os.remove(path)
+                removed += 1
+        return removed
@@ -0,0 +1,102 @@
+import re
+import time
+from collections import Counter
+from typing import Optional, Tuple
+
+import fitz  # PyMuPDF for PDF parsing
+
+DEFAULT_MAX_PAGES = 30
+DEFAULT_MAX_CHARS = 60000
+# How many lines at the top/bottom of a page are considered header/footer candidates
+EDGE_LINES = 2
+
+
+def _edge_size(lines) -> int:
+    # Never treat more than a third of a page as header/footer
+    return min(EDGE_LINES, len(lines) // 3)
+
+
+def _edge_key(line: str) -> str:
+    # Page numbers differ per page, so "Page 3 of 9" and "Page 4 of 9" should match
+    return re.sub(r"\d+", "#", line.strip().lower())
+
+
+def extract_pdf_text(
+    pdf_path: str,
+    max_pages: Optional[int] = DEFAULT_MAX_PAGES,
+    max_chars: Optional[int] = DEFAULT_MAX_CHARS,
+    strip_repeated: bool = True,
+) -> Tuple[str, dict]:
+    """
+    Extract text page by page with a page and character cap.
+
+    Lines repeated at the top or bottom of most pages (running headers, footers,
+    page numbers) are dropped. The document is closed before returning.
+
+    Args:
+        pdf_path (str): PDF to read.
+        max_pages (int, optional): Stop after this many pages; None for no cap.
+        max_chars (int, optional): Stop once this many characters are collected; None for no cap.
+        strip_repeated (bool): Drop header/footer lines repeated across pages.
+
+    Returns:
+        tuple: The extracted text and a stats dict with pages, total_pages, chars,
+        truncated and seconds.
+    """
+    start = time.perf_counter()
+    pages = []
+    collected = 0
+    truncated = False
+
+    with fitz.open(pdf_path) as doc:
+        total_pages = doc.page_count
+        for page_number, page in enumerate(doc):
+            if max_pages is not None and page_number >= max_pages:
+                truncated = True
+                break
+            lines = [line for line in page.get_text().splitlines() if line.strip()]
+            pages.append(lines)
+            collected += sum(len(line) + 1 for line in lines)
+            if max_chars is not None and collected >= max_chars:
+                truncated = page_number + 1 < total_pages
+                break
+
+    if strip_repeated and len(pages) > 2:
+        edge_counts = Counter()
+        for lines in pages:
+            k = _edge_size(lines)
+            edges = lines[:k] + lines[len(lines) - k:]
+            edge_counts.update({_edge_key(line) for line in edges})
+        threshold = max(2, len(pages) // 2 + 1)
+        repeated = {key for key, count in edge_counts.items() if count >= threshold}
+        if repeated:
+            pages = [
+                [
+                    line for j, line in enumerate(lines)
+                    if not ((j < k or j >= len(lines) - k) and _edge_key(line) in repeated)
+                ]
+                for lines, k in ((lines, _edge_size(lines)) for lines in pages)
+            ]
+
+    text = "\n\n".join("\n".join(lines) for lines in pages)
+    if max_chars is not None and len(text) > max_chars:
+        text = text[:max_chars]
+        truncated = True
+
+    return text, {
+        "pages": len(pages),
+        "total_pages": total_pages,
+        "chars": len(text),
+        "truncated": truncated,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def read_pdf_text(
+    pdf_path: str,
+    max_pages: Optional[int] = DEFAULT_MAX_PAGES,
+    max_chars: Optional[int] = DEFAULT_MAX_CHARS,
+) -> str:
+    # Module-level so it can be shipped to a process pool
+    text, _ = extract_pdf_text(pdf_path, max_pages=max_pages, max_chars=max_chars)
+    return text
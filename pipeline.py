@@ -0,0 +1,160 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from typing import Iterator, List, Optional, Tuple
+
+from pdf_extract import extract_pdf_text
+
+_DONE = object()
+
+
+def iter_parsed_resumes(
+    pdf_paths: List[str],
+    llm,
+    llm_workers: int = 4,
+    extract_workers: Optional[int] = None,
+    queue_size: int = 16,
+) -> Iterator[Tuple[int, Optional[dict], Optional[Exception]]]:
+    """
+    Parse PDFs with text extraction and LLM inference running as separate stages.
+
+    A process pool extracts text and feeds a bounded queue, which is streamed into
+    the adapter's `parse_texts_many` batch method. At most `queue_size` extractions
+    are in flight and at most `queue_size` texts wait in the queue, so memory stays
+    bounded however large the folder is.
+
+    Args:
+        pdf_paths (list): PDFs to parse.
+        llm (LLMAdapter): Backend implementing `parse_resume_text` (or `parse_texts_many`).
+        llm_workers (int): Number of concurrent LLM requests.
+        extract_workers (int, optional): Extraction processes, defaults to the CPU count.
+        queue_size (int): Bound on pending extractions and queued texts.
+
+    Yields:
+        tuple: (index into pdf_paths, parsed resume or None, exception or None),
+        in completion order.
+    """
+    llm_workers = max(1, llm_workers)
+    text_queue = queue.Queue(maxsize=queue_size)
+    result_queue = queue.Queue()
+    extract = partial(extract_pdf_text, **getattr(llm, "extract_options", {}))
+    stats = {"files": 0, "pages": 0, "chars": 0, "truncated": 0}
+    metrics = getattr(llm, "metrics", None)
+    # Set when the caller stops iterating early; every stage winds down without blocking
+    stop = threading.Event()
+    # Indices the producer has passed on (to the LLM stage or as an error result)
+    handed_off = set()
+
+    def put_text(item) -> bool:
+        # Blocks while the LLM stage is behind, which throttles extraction
+        while not stop.is_set():
+            try:
+                text_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        error = None
+        try:
+            with ProcessPoolExecutor(max_workers=extract_workers or os.cpu_count()) as pool:
+                in_flight = {}
+                try:
+                    for i, path in enumerate(pdf_paths):
+                        if stop.is_set():
+                            break
+                        if len(in_flight) >= queue_size:
+                            forward(in_flight)
+                        try:
+                            in_flight[pool.submit(extract, path)] = i
+                        except Exception as e:
+                            handed_off.add(i)
+                            result_queue.put((i, None, e))
+                    while in_flight and not stop.is_set():
+                        forward(in_flight)
+                finally:
+                    if stop.is_set():
+                        pool.shutdown(wait=False, cancel_futures=True)
+        except Exception as e:
+            error = e
+        finally:
+            # Whatever never reached the LLM stage is reported, so the caller never waits forever
+            for i in range(len(pdf_paths)):
+                if i not in handed_off:
+                    result_queue.put((i, None, error or RuntimeError("PDF extraction stopped early")))
+            put_text(_DONE)
+
+    def forward(in_flight):
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = in_flight.pop(future)
+            try:
+                text, file_stats = future.result()
+            except Exception as e:
+                handed_off.add(i)
+                result_queue.put((i, None, e))
+                continue
+            stats["files"] += 1
+            stats["pages"] += file_stats["pages"]
+            stats["chars"] += file_stats["chars"]
+            stats["truncated"] += file_stats["truncated"]
+            if metrics is not None:
+                metrics.observe("pdf_extract", file_stats["seconds"])
+            if put_text((i, text, time.perf_counter())):
+                handed_off.add(i)
+
+    def texts(order: list):
+        # Streams extracted texts into the batch as it frees slots, recording their indices
+        while not stop.is_set():
+            try:
+                item = text_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            i, text, queued = item
+            if metrics is not None:
+                metrics.observe("queue_wait", time.perf_counter() - queued)
+            order.append(i)
+            yield text
+
+    def consume():
+        order = []
+        reported = set()
+        stream = texts(order)
+        batch = llm.parse_texts_many(stream, max_workers=llm_workers)
+        try:
+            for n, parsed, error in batch:
+                reported.add(n)
+                result_queue.put((order[n], parsed, error))
+                if stop.is_set():
+                    return
+        except Exception as e:
+            # The batch itself broke: fail what it took on, then whatever is still coming
+            for n, i in enumerate(order):
+                if n not in reported:
+                    result_queue.put((i, None, e))
+            for _ in stream:
+                result_queue.put((order[-1], None, e))
+        finally:
+            batch.close()
+
+    threads = [threading.Thread(target=produce, daemon=True), threading.Thread(target=consume, daemon=True)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for _ in range(len(pdf_paths)):
+            yield result_queue.get()
+    finally:
+        # Also reached on GeneratorExit; in-flight LLM requests finish, nothing new starts
+        stop.set()
+
+    print(
+        f"📄 Extracted {stats['pages']} page(s), {stats['chars']} chars from {stats['files']} PDF(s)"
+        f" ({stats['truncated']} truncated by page/char caps)."
+    )
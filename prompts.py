@@ -2,19 +2,21 @@
 
 
 
+# Bump whenever the template below (or how resumes are rendered into it) changes
+# so cached analyses are invalidated.
+# The template is laid out static-first: instructions, then the job description,
+# then the resume last, so every request for one job description shares a long
+# common prefix the inference server can serve from its KV cache.
+PROMPT_VERSION = "3"
+
 prompt = '''
 You are a highly experienced Talent Acquisition Specialist with 15+ years of experience in technical recruitment, specializing in [**Insert Job Field - e.g., Software Engineering, Data Science, 
 Marketing**]. You are tasked with evaluating candidate resumes against a specific job description to determine their suitability for the role. Your analysis must be thorough, nuanced, and provide 
 actionable insights.
 
-**Here's the context:**
-
-*   **Job Description:** {job_description}
-*   **Resume:** {resume}
-
 **Your Task:**
 
-Analyze the provided resume against the job description.  Provide a detailed report structured into the following sections:
+Analyze the resume provided at the end against the job description that precedes it.  Provide a detailed report structured into the following sections:
 
 **1. Overall Match Assessment (Score: 1-10, 1=Poor, 10=Excellent):**
    *   Provide an overall score reflecting the candidate's overall fit for the role.
@@ -63,7 +65,12 @@ costs by 10%").  If not, suggest how they could strengthen their resume to showc
 
 
 **Output Format:** {output_format}
-''' 
+
+**Here's the context:**
+
+*   **Job Description:** {job_description}
+*   **Resume:** {resume}
+'''
 
 def build_prompt(job_description: str, resume: str, output_format: str) -> str:
     """
@@ -77,4 +84,23 @@ def build_prompt(job_description: str, resume: str, output_format: str) -> str:
     Returns:
         str: The formatted prompt for the LLM.
     """
-    return prompt.format(job_description=job_description, resume=resume, output_format=output_format)
\ No newline at end of file
+    return prompt.format(job_description=job_description, resume=resume, output_format=output_format)
+
+# Cheap first-pass prompt: one score and one sentence, so most candidates cost a
+# few dozen generated tokens instead of a full report. Same static-first layout.
+TRIAGE_PROMPT_VERSION = "1"
+
+triage_prompt = '''
+You are screening candidate resumes for a role. Rate how well the resume fits the job description on a scale of 1-10
+(1=Poor, 10=Excellent), weighing required skills and directly relevant experience most. Give a single short sentence
+as the reason. Do not write anything else.
+
+**Output Format:** JSON with keys Score and Reason.
+
+**Job Description:** {job_description}
+
+**Resume:** {resume}
+'''
+
+def build_triage_prompt(job_description: str, resume: str) -> str:
+    return triage_prompt.format(job_description=job_description, resume=resume)
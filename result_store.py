@@ -0,0 +1,333 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Iterator, List, Optional, Set
+
+from analysis_cache import normalize_job_description
+
+RESULT_STORE_PATH = os.path.join("output", "results.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    application_id TEXT PRIMARY KEY,
+    full_name TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parsed_resumes (
+    resume_file TEXT NOT NULL,
+    application_id TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    phone TEXT,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (resume_file, application_id)
+);
+CREATE INDEX IF NOT EXISTS idx_parsed_resumes_application ON parsed_resumes(application_id);
+CREATE TABLE IF NOT EXISTS duplicates (
+    resume_file TEXT PRIMARY KEY,
+    duplicate_of TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_duplicates_of ON duplicates(duplicate_of);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    job_id TEXT NOT NULL,
+    application_id TEXT NOT NULL,
+    resume_file TEXT,
+    full_name TEXT,
+    score INTEGER,
+    recommendation TEXT,
+    failed INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, application_id)
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses(job_id, score DESC);
+CREATE INDEX IF NOT EXISTS idx_analyses_application ON analyses(application_id);
+CREATE TABLE IF NOT EXISTS triage (
+    job_id TEXT NOT NULL,
+    application_id TEXT NOT NULL,
+    score INTEGER,
+    reason TEXT,
+    advanced INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, application_id)
+);
+CREATE INDEX IF NOT EXISTS idx_triage_score ON triage(job_id, score DESC);
+"""
+
+
+def job_id_for(job_description: str) -> str:
+    digest = hashlib.sha256(normalize_job_description(job_description).encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def application_id_for(entry: dict) -> str:
+    candidate = entry["candidate"]
+    return str(candidate.get("Application Id") or candidate.get("Application ID") or entry["resume_file"])
+
+
+def full_name_for(candidate: dict) -> str:
+    return candidate.get("Full Name") or f"{candidate.get('First Name', '')} {candidate.get('Last Name', '')}".strip()
+
+
+def _dumps(value) -> str:
+    # Candidate rows come from pandas and may hold numpy scalars or timestamps
+    return json.dumps(value, default=str)
+
+
+def _score(analysis: dict):
+    score = (analysis.get("Overall Match Assessment") or {}).get("Score")
+    return score if isinstance(score, (int, float)) else None
+
+
+def _recommendation(analysis: dict):
+    return (analysis.get("Overall Recommendation") or {}).get("Recommendation")
+
+
+class ResultStore:
+    """
+    SQLite store for candidates, parsed resumes, duplicate links and analyses.
+
+    Rows are upserted individually, so a rerun only rewrites what changed, and
+    analyses are indexed by (job, score) and application ID for querying.
+    The database runs in WAL mode; writes from worker threads are serialized.
+    """
+
+    def __init__(self, path: str = RESULT_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Commits survive a process crash; only an OS crash can lose the last few
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        # Stores created before parses were keyed per application kept one row per file,
+        # so a file attached to several applications lost all but the last one
+        key = sorted((row["pk"], row["name"]) for row in self._conn.execute("PRAGMA table_info(parsed_resumes)") if row["pk"])
+        if [name for _, name in key] != ["resume_file"]:
+            return
+        self._conn.executescript(
+            "BEGIN;"
+            "DROP INDEX IF EXISTS idx_parsed_resumes_application;"
+            "ALTER TABLE parsed_resumes RENAME TO parsed_resumes_by_file;"
+            + SCHEMA +
+            "INSERT INTO parsed_resumes SELECT * FROM parsed_resumes_by_file;"
+            "DROP TABLE parsed_resumes_by_file;"
+            "COMMIT;"
+        )
+
+    def save_parsed_resumes(self, entries: list) -> int:
+        """Upsert candidates, their parsed resumes and duplicate links; returns how many parses changed."""
+        now = time.time()
+        candidate_rows = []
+        resume_rows = []
+        duplicate_rows = []
+        unique_files = []
+        for entry in entries:
+            candidate = entry["candidate"]
+            parsed = entry["parsed_resume"]
+            application_id = application_id_for(entry)
+            data = _dumps(parsed)
+            candidate_rows.append((application_id, full_name_for(candidate), _dumps(candidate), now))
+            resume_rows.append((
+                entry["resume_file"],
+                application_id,
+                parsed.get("name"),
+                parsed.get("email"),
+                parsed.get("phone"),
+                hashlib.sha256(data.encode("utf-8")).hexdigest(),
+                data,
+                now,
+            ))
+            link = entry.get("duplicate_of")
+            if link:
+                duplicate_rows.append((entry["resume_file"], link["resume_file"], link["kind"], link["similarity"], now))
+            else:
+                unique_files.append((entry["resume_file"],))
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO candidates VALUES (?, ?, ?, ?)
+                   ON CONFLICT(application_id) DO UPDATE SET
+                       full_name = excluded.full_name, data = excluded.data, updated_at = excluded.updated_at
+                   WHERE candidates.data != excluded.data""",
+                candidate_rows,
+            )
+            before = self._conn.total_changes
+            self._conn.executemany(
+                """INSERT INTO parsed_resumes VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(resume_file, application_id) DO UPDATE SET
+                       name = excluded.name,
+                       email = excluded.email, phone = excluded.phone,
+                       content_hash = excluded.content_hash, data = excluded.data,
+                       updated_at = excluded.updated_at
+                   WHERE parsed_resumes.content_hash != excluded.content_hash""",
+                resume_rows,
+            )
+            changed = self._conn.total_changes - before
+            self._conn.executemany(
+                """INSERT INTO duplicates VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(resume_file) DO UPDATE SET
+                       duplicate_of = excluded.duplicate_of, kind = excluded.kind,
+                       similarity = excluded.similarity, updated_at = excluded.updated_at""",
+                duplicate_rows,
+            )
+            # A file that is no longer a duplicate (e.g. its twin was removed) drops its link
+            self._conn.executemany("DELETE FROM duplicates WHERE resume_file = ?", unique_files)
+            return changed
+
+    def parsed_resume(self, application_id: str, resume_file: Optional[str] = None) -> Optional[dict]:
+        """An application's parsed resume; the most recently updated one unless resume_file is given."""
+        query = "SELECT data FROM parsed_resumes WHERE application_id = ?"
+        params = [str(application_id)]
+        if resume_file is not None:
+            query += " AND resume_file = ?"
+            params.append(resume_file)
+        row = self._conn.execute(query + " ORDER BY updated_at DESC LIMIT 1", params).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def add_job(self, job_description: str, name: Optional[str] = None) -> str:
+        job_id = job_id_for(job_description)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?) ON CONFLICT(job_id) DO UPDATE SET name = COALESCE(excluded.name, jobs.name)",
+                (job_id, name, job_description, time.time()),
+            )
+        return job_id
+
+    def completed_ids(self, job_id: str) -> Set[str]:
+        # Failed analyses don't count as done, so they are retried on restart
+        rows = self._conn.execute("SELECT application_id FROM analyses WHERE job_id = ? AND failed = 0", (job_id,))
+        return {row["application_id"] for row in rows}
+
+    def save_analyses(self, job_id: str, summaries: List[dict]):
+        now = time.time()
+        rows = [
+            (
+                job_id,
+                str(s["application_id"]),
+                s.get("resume_file"),
+                s.get("full_name"),
+                _score(s["analysis"]),
+                _recommendation(s["analysis"]),
+                int("error" in s["analysis"]),
+                _dumps(s["analysis"]),
+                now,
+            )
+            for s in summaries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(job_id, application_id) DO UPDATE SET
+                       resume_file = excluded.resume_file, full_name = excluded.full_name,
+                       score = excluded.score, recommendation = excluded.recommendation,
+                       failed = excluded.failed, data = excluded.data, updated_at = excluded.updated_at""",
+                rows,
+            )
+
+    def save_triage(self, job_id: str, rows: List[tuple]):
+        """Record (entry, triage_result, advanced) rows for a job's first-pass screen."""
+        now = time.time()
+        values = [
+            (job_id, application_id_for(entry), result.get("Score"), result.get("Reason") or result.get("error"), int(advanced), now)
+            for entry, result, advanced in rows
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """INSERT INTO triage VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(job_id, application_id) DO UPDATE SET
+                       score = excluded.score, reason = excluded.reason,
+                       advanced = excluded.advanced, updated_at = excluded.updated_at""",
+                values,
+            )
+
+    def writer(self, job_id: str, commit_every: int = 10) -> "AnalysisWriter":
+        return AnalysisWriter(self, job_id, commit_every)
+
+    def iter_analyses(self, job_id: str, min_score: Optional[int] = None, limit: Optional[int] = None) -> Iterator[dict]:
+        """Yield summaries for a job, best score first, without loading them all at once."""
+        query = "SELECT application_id, full_name, resume_file, data FROM analyses WHERE job_id = ? AND failed = 0"
+        params = [job_id]
+        if min_score is not None:
+            query += " AND score >= ?"
+            params.append(min_score)
+        query += " ORDER BY score DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        for row in self._conn.execute(query, params):
+            yield {
+                "application_id": row["application_id"],
+                "full_name": row["full_name"],
+                "resume_file": row["resume_file"],
+                "analysis": json.loads(row["data"]),
+            }
+
+    def export_jsonl(self, job_id: str, results_dir: str, name: str = "analysis") -> str:
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_") or "analysis"
+        path = os.path.join(results_dir, f"{slug}_{job_id}.jsonl")
+        os.makedirs(results_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            for summary in self.iter_analyses(job_id):
+                f.write(_dumps(summary) + "\n")
+        os.replace(tmp_path, path)
+        return path
+
+    def close(self):
+        self._conn.close()
+
+
+class AnalysisWriter:
+    """
+    Buffers analysis summaries for one job and commits them in batches.
+
+    A crash loses at most `commit_every` uncommitted results, which are then
+    redone on the next run.
+    """
+
+    def __init__(self, store: ResultStore, job_id: str, commit_every: int = 10):
+        self.store = store
+        self.job_id = job_id
+        self.commit_every = max(1, commit_every)
+        self._buffer = []
+
+    def write(self, summary: dict):
+        self._buffer.append(summary)
+        if len(self._buffer) >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.store.save_analyses(self.job_id, self._buffer)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,102 @@
+from typing import Optional
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+CLOSERS = {"{": "}", "[": "]"}
+
+
+class StreamingJSONParser:
+    """
+    Incrementally pull the first top-level JSON object out of streamed LLM output.
+
+    `<think>...</think>` reasoning blocks are discarded as they arrive (tags may be
+    split across chunks), so only the JSON itself is ever buffered. Parsing stops
+    once the top-level object closes; mismatched brackets or too much non-JSON
+    preamble mark the output as malformed without waiting for the rest.
+    """
+
+    def __init__(self, max_preamble: int = 2000):
+        self.max_preamble = max_preamble
+        self.done = False
+        self.error: Optional[str] = None
+        self._pending = ""  # may hold a partial <think>/</think> tag
+        self._in_think = False
+        self._preamble = 0
+        self._buffer = []
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def finished(self) -> bool:
+        return self.done or self.error is not None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buffer)
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once parsing is finished (done or error)."""
+        if self.finished:
+            return True
+        data = self._pending + chunk
+        self._pending = ""
+        i = 0
+        while i < len(data) and not self.finished:
+            if self._in_think:
+                end = data.find(THINK_CLOSE, i)
+                if end == -1:
+                    self._pending = _partial_suffix(data, THINK_CLOSE)
+                    return False
+                self._in_think = False
+                i = end + len(THINK_CLOSE)
+                continue
+
+            if not self._stack:
+                # Outside the JSON object: skip reasoning blocks and preamble
+                if data.startswith(THINK_OPEN, i):
+                    self._in_think = True
+                    i += len(THINK_OPEN)
+                    continue
+                if THINK_OPEN.startswith(data[i:]) and data[i:]:
+                    self._pending = data[i:]
+                    return False
+                char = data[i]
+                if char == "{":
+                    self._stack.append("}")
+                    self._buffer.append(char)
+                else:
+                    self._preamble += 1
+                    if self._preamble > self.max_preamble:
+                        self.error = "no JSON object found in the first response characters"
+                i += 1
+                continue
+
+            char = data[i]
+            self._buffer.append(char)
+            i += 1
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in CLOSERS:
+                self._stack.append(CLOSERS[char])
+            elif char in "}]":
+                if char != self._stack.pop():
+                    self.error = f"mismatched '{char}' in JSON output"
+                elif not self._stack:
+                    self.done = True
+        return self.finished
+
+
+def _partial_suffix(data: str, tag: str) -> str:
+    # Longest suffix of data that is a prefix of tag, kept for the next chunk
+    for size in range(min(len(tag) - 1, len(data)), 0, -1):
+        if tag.startswith(data[-size:]):
+            return data[-size:]
+    return ""
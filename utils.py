@@ -3,6 +3,19 @@ import pandas as pd
 from typing import List
 from tqdm import tqdm
 
+from contact_fields import reapply_contact_fields
+from dedup import (
+    DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    exact_duplicates,
+    file_signatures,
+    merge_duplicates,
+    near_duplicates,
+    read_texts,
+    report_duplicates,
+)
+from parse_cache import file_sha256
+from pipeline import iter_parsed_resumes
+
 def confirm_fields(df: pd.DataFrame, label: str) -> List[str]:
     print(f"\n📝 Fields available in {label} data:")
     for i, col in enumerate(df.columns):
@@ -15,32 +28,214 @@ def confirm_fields(df: pd.DataFrame, label: str) -> List[str]:
         indices = [int(i) for i in selected.split(',')]
         return [df.columns[i] for i in indices]
 
-def load_pdfs_from_attachments(candidates_df, attachments_df, resume_dir, llm):
-    data = []
-    for _, row in tqdm(attachments_df.iterrows(), total=len(attachments_df)):
-        parent_id = row.get('Parent Id')
-        pdf_name = row.get('File Name')
+def _report_skipped(label: str, items: List[str], limit: int = 5):
+    if not items:
+        return
+    preview = ", ".join(str(item) for item in items[:limit])
+    more = f" (+{len(items) - limit} more)" if len(items) > limit else ""
+    print(f"{label} ({len(items)}): {preview}{more}")
 
-        if not parent_id or not pdf_name:
-            continue
+def collect_attachments(candidates_df, attachments_df, resume_dir):
+    # Index candidate metadata once by Application Id; the first row wins on duplicates
+    app_ids = candidates_df['Application Id']
+    duplicate_ids = app_ids[app_ids.duplicated()].unique().tolist()
+    candidates = candidates_df[~app_ids.duplicated()].set_index('Application Id', drop=False)
+
+    attachments = attachments_df[['Parent Id', 'File Name']]
+    has_fields = attachments.notna().all(axis=1) & (attachments.astype(str) != '').all(axis=1)
+    attachments = attachments[has_fields]
+
+    file_paths = [os.path.join(resume_dir, name) for name in attachments['File Name']]
+    file_exists = pd.Series([os.path.exists(path) for path in file_paths], index=attachments.index)
+    matched = attachments['Parent Id'].isin(candidates.index)
+
+    missing_files = [path for path, ok in zip(file_paths, file_exists) if not ok]
+    unmatched_ids = attachments.loc[file_exists & ~matched, 'Parent Id'].unique().tolist()
+
+    keep = file_exists & matched
+    attachments = attachments[keep]
+    file_paths = [path for path, ok in zip(file_paths, keep) if ok]
+    candidate_metas = candidates.loc[attachments['Parent Id']].to_dict('records')
+
+    skipped_rows = int((~has_fields).sum())
+    if skipped_rows:
+        print(f"⚠️ Skipped {skipped_rows} attachment row(s) without a Parent Id or File Name.")
+    _report_skipped("❌ Files not found", missing_files)
+    _report_skipped("⚠️ No candidate metadata for", unmatched_ids)
+    _report_skipped("⚠️ Duplicate Application Ids (first row used)", duplicate_ids)
 
-        file_path = os.path.join(resume_dir, pdf_name)
-        if not os.path.exists(file_path):
-            print(f"❌ File not found: {file_path}")
+    return list(zip(attachments['File Name'], file_paths, candidate_metas))
+
+def plan_parses(
+    jobs,
+    llm,
+    cache=None,
+    dedup: bool = True,
+    near_threshold=DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    workers: int = 1,
+    signature_cache=None,
+) -> dict:
+    """
+    Work out which attachments need an LLM parse, before any request is made.
+
+    Byte-identical files are linked first. The near-duplicate pass compares MinHash
+    signatures of every distinct file, taking them from signature_cache where it can,
+    so only files it hasn't seen are extracted, and only their signatures are kept.
+    The parse cache is then checked once per file that still needs its own parse.
+
+    Returns:
+        dict: "cached" {index: parsed resume}, "pending" [indices to parse],
+        "duplicates" {index: link, see dedup.exact_duplicates} and "cache_keys" [key or None].
+    """
+    paths = [file_path for _, file_path, _ in jobs]
+    digests = [file_sha256(path) for path in paths] if dedup or cache is not None else [None] * len(jobs)
+    duplicates = exact_duplicates(digests, paths) if dedup else {}
+
+    if dedup and near_threshold:
+        distinct = [i for i in range(len(jobs)) if i not in duplicates]
+        unseen = [i for i in distinct if signature_cache is None or digests[i] not in signature_cache]
+        extract_options = getattr(llm, "extract_options", {})
+        signatures = dict(zip(unseen, file_signatures([paths[i] for i in unseen], extract_options, workers)))
+        if signature_cache is not None:
+            for i in unseen:
+                signature_cache.put(digests[i], signatures[i])
+            signature_cache.save()
+            signatures.update((i, signature_cache.get(digests[i])) for i in distinct if i not in signatures)
+        near = near_duplicates({i: sig for i, sig in signatures.items() if sig is not None}, near_threshold)
+        duplicates = merge_duplicates(duplicates, near)
+
+    cache_keys = [None] * len(jobs)
+    cached = {}
+    pending = []
+    for i, path in enumerate(paths):
+        if i in duplicates:
             continue
+        if cache is not None:
+            cache_keys[i] = cache.key_for(path, llm, digest=digests[i])
+            parsed_resume = cache.get(cache_keys[i])
+            if parsed_resume is not None:
+                cached[i] = parsed_resume
+                continue
+        pending.append(i)
+
+    report_duplicates([pdf_name for pdf_name, _, _ in jobs], duplicates)
+    metrics = getattr(llm, "metrics", None)
+    if metrics is not None:
+        for link in duplicates.values():
+            metrics.increment(f"duplicate_resumes_{link['kind']}")
+    return {"cached": cached, "pending": pending, "duplicates": duplicates, "cache_keys": cache_keys}
 
-        candidate_row = candidates_df[candidates_df['Application Id'] == parent_id]
-        if candidate_row.empty:
-            print(f"⚠️ No candidate metadata for {parent_id}")
+def share_duplicate_parses(jobs, results: list, duplicates: dict, extract_options: dict = None, workers: int = 1) -> List[str]:
+    """
+    Give each duplicate attachment a copy of its canonical file's entry, recording the
+    link under "duplicate_of" (except for the same file attached again). Near-duplicates keep the shared sections but take
+    contact fields from their own text. Returns the duplicates left unparsed because
+    their canonical file failed.
+    """
+    near = [i for i, link in duplicates.items() if link["kind"] == "near" and results[link["of"]] is not None]
+    texts = dict(zip(near, read_texts([jobs[i][1] for i in near], extract_options, workers)))
+    failed = []
+    for i, link in duplicates.items():
+        source = results[link["of"]]
+        if source is None:
+            failed.append(jobs[i][0])
             continue
+        parsed_resume = dict(source["parsed_resume"])
+        if link["kind"] == "near" and texts.get(i):
+            parsed_resume = reapply_contact_fields(parsed_resume, texts[i])
+        pdf_name, _, candidate_meta = jobs[i]
+        results[i] = {
+            "resume_file": pdf_name,
+            "candidate": candidate_meta,
+            "parsed_resume": parsed_resume,
+        }
+        if link["kind"] != "same_file":
+            results[i]["duplicate_of"] = {"resume_file": jobs[link["of"]][0], "kind": link["kind"], "similarity": link["similarity"]}
+    return failed
+
+def load_pdfs_from_attachments(
+    candidates_df,
+    attachments_df,
+    resume_dir,
+    llm,
+    max_workers: int = 1,
+    cache=None,
+    extract_workers: int = 0,
+    dedup: bool = True,
+    near_duplicate_threshold=DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    signature_cache=None,
+):
+    """
+    Parse every attached resume with the LLM and join it to its candidate metadata.
 
-        candidate_meta = candidate_row.iloc[0].to_dict()
-        parsed_resume = llm.parse_resume(file_path)
+    Args:
+        candidates_df (pd.DataFrame): Candidate rows keyed by 'Application Id'.
+        attachments_df (pd.DataFrame): Attachment rows with 'Parent Id' and 'File Name'.
+        resume_dir (str): Folder containing the resume PDFs.
+        llm (LLMAdapter): Backend used to parse each resume.
+        max_workers (int): Number of parse requests kept in flight at once.
+        cache (ParseCache, optional): Per-file parse cache; only misses reach the LLM.
+        extract_workers (int): When > 0, extract PDF text in this many processes as a
+            separate pipeline stage feeding the LLM workers (see pipeline.py).
+        dedup (bool): Parse identical or near-identical files once and share the result
+            (see plan_parses); near-duplicates keep their own contact fields.
+        near_duplicate_threshold (float, optional): Shingle similarity for near-duplicates;
+            None to only share parses between byte-identical files.
+        signature_cache (SignatureCache, optional): MinHash signatures from earlier runs,
+            so files seen before aren't extracted just to look for near-duplicates.
 
-        data.append({
+    Returns:
+        list: One entry per parsed resume, in attachment order.
+    """
+    jobs = collect_attachments(candidates_df, attachments_df, resume_dir)
+    results = [None] * len(jobs)
+    failed = []
+
+    def make_entry(i, parsed_resume):
+        pdf_name, _, candidate_meta = jobs[i]
+        return {
             "resume_file": pdf_name,
             "candidate": candidate_meta,
             "parsed_resume": parsed_resume
-        })
+        }
+
+    plan = plan_parses(
+        jobs, llm, cache, dedup, near_duplicate_threshold, workers=max(1, extract_workers), signature_cache=signature_cache
+    )
+    for i, parsed_resume in plan["cached"].items():
+        results[i] = make_entry(i, parsed_resume)
+    cache_keys = plan["cache_keys"]
+    pending = plan["pending"]
+
+    if cache is not None:
+        print(f"💾 Parse cache: {cache.hits} hit(s), {len(pending)} resume(s) to parse.")
+
+    if not pending:
+        parsed_iter = iter(())
+    else:
+        # Load the parse model once up front and keep it resident for the batch
+        llm.preload(getattr(llm, "parse_model", None))
+        pdf_paths = [jobs[i][1] for i in pending]
+        if extract_workers > 0 and llm.supports("parse_resume_text"):
+            parsed_iter = iter_parsed_resumes(pdf_paths, llm, llm_workers=max_workers, extract_workers=extract_workers)
+        else:
+            parsed_iter = llm.parse_many(pdf_paths, max_workers=max_workers)
+
+    for n, parsed_resume, error in tqdm(parsed_iter, total=len(pending)):
+        i = pending[n]
+        if error is not None:
+            print(f"❌ Failed to parse {jobs[i][0]}: {error}")
+            failed.append(jobs[i][0])
+            continue
+
+        if cache is not None:
+            cache.put(cache_keys[i], parsed_resume)
+        results[i] = make_entry(i, parsed_resume)
+
+    failed += share_duplicate_parses(
+        jobs, results, plan["duplicates"], getattr(llm, "extract_options", {}), workers=max(1, extract_workers)
+    )
+    if failed:
+        print(f"⚠️ {len(failed)} resume(s) failed to parse and were skipped.")
 
-    return data
+    return [entry for entry in results if entry is not None]
@@ -0,0 +1,139 @@
+import os
+import json
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from lexical_index import resume_search_text
+
+VECTOR_INDEX_DIR = os.path.join("output", "embeddings")
+
+
+class VectorIndex:
+    """
+    On-disk embedding index for semantic resume ranking.
+
+    Unit-normalised float32 vectors live in a memory-mapped .npy matrix next to the
+    parse cache, with row ids and content hashes in meta.json. New or changed
+    resumes are embedded and written in place; the matrix grows geometrically so
+    adding resumes never re-embeds the existing ones.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        model_name: str,
+        index_dir: str = VECTOR_INDEX_DIR,
+        batch_size: int = 32,
+    ):
+        self.embed_fn = embed_fn
+        self.model_name = model_name
+        self.index_dir = index_dir
+        self.batch_size = batch_size
+        self.vectors_path = os.path.join(index_dir, "vectors.npy")
+        self.meta_path = os.path.join(index_dir, "meta.json")
+        self.ids: List[str] = []
+        self.hashes: Dict[str, str] = {}
+        self.vectors = None
+        os.makedirs(index_dir, exist_ok=True)
+        self._load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _load(self):
+        try:
+            with open(self.meta_path, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Vectors from a different embedding model aren't comparable; start over
+        if meta.get("model") != self.model_name or not os.path.exists(self.vectors_path):
+            return
+        self.ids = meta["ids"]
+        self.hashes = meta["hashes"]
+        self.vectors = np.lib.format.open_memmap(self.vectors_path, mode="r+")
+
+    def _save_meta(self):
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"model": self.model_name, "ids": self.ids, "hashes": self.hashes}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        if self.vectors is not None and self.vectors.shape[1] != dim:
+            self.ids, self.hashes, self.vectors = [], {}, None
+        if self.vectors is not None and rows <= self.vectors.shape[0]:
+            return
+        capacity = max(rows, 2 * (self.vectors.shape[0] if self.vectors is not None else 0), 64)
+        tmp_path = f"{self.vectors_path}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if self.vectors is not None and self.ids:
+            grown[: len(self.ids)] = self.vectors[: len(self.ids)]
+        grown.flush()
+        del grown
+        self.vectors = None
+        os.replace(tmp_path, self.vectors_path)
+        self.vectors = np.lib.format.open_memmap(self.vectors_path, mode="r+")
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.asarray(self.embed_fn(texts), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def update_from_resumes(self, resumes_data: Iterable[dict]) -> int:
+        """Embed new or changed resumes. Returns the number of vectors written."""
+        todo = []
+        for entry in resumes_data:
+            if "error" in entry["parsed_resume"]:
+                continue
+            text = resume_search_text(entry["parsed_resume"])
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if self.hashes.get(entry["resume_file"]) != digest:
+                todo.append((entry["resume_file"], text, digest))
+
+        row_of = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        for start in range(0, len(todo), self.batch_size):
+            batch = todo[start:start + self.batch_size]
+            matrix = self._embed([text for _, text, _ in batch])
+            new_ids = [doc_id for doc_id, _, _ in batch if doc_id not in row_of]
+            self._ensure_capacity(len(self.ids) + len(new_ids), matrix.shape[1])
+            if not self.ids:
+                row_of = {}
+            for (doc_id, _, digest), vector in zip(batch, matrix):
+                if doc_id not in row_of:
+                    row_of[doc_id] = len(self.ids)
+                    self.ids.append(doc_id)
+                self.vectors[row_of[doc_id]] = vector
+                self.hashes[doc_id] = digest
+            self.vectors.flush()
+            self._save_meta()
+        return len(todo)
+
+    def rank(
+        self,
+        query: str,
+        doc_ids: Optional[Iterable[str]] = None,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        if not self.ids:
+            return []
+        query_vector = self._embed([query])[0]
+        if doc_ids is None:
+            rows = np.arange(len(self.ids))
+        else:
+            wanted = set(doc_ids)
+            rows = np.array([i for i, doc_id in enumerate(self.ids) if doc_id in wanted], dtype=np.int64)
+        if not len(rows):
+            return []
+
+        # Single vectorised cosine-similarity pass over the memory-mapped matrix
+        scores = self.vectors[rows] @ query_vector
+        order = np.argsort(-scores)
+        if min_score is not None:
+            order = order[scores[order] >= min_score]
+        if top_k is not None:
+            order = order[:top_k]
+        return [(self.ids[rows[i]], float(scores[i])) for i in order]
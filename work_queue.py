@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WORK_QUEUE_PATH = os.path.join("output", "work_queue.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks(kind, status, lease_expires);
+"""
+
+# Task states: pending -> leased -> done | failed; an expired lease counts as pending again
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+
+class WorkQueue:
+    """
+    Durable SQLite task queue with leases, shared by any number of worker processes.
+
+    A worker claims tasks for lease_seconds and must heartbeat to keep them; a
+    task whose lease expires (worker killed or stuck) is handed to the next
+    claimant. Completion is fenced on the lease owner, so a late result from a
+    worker that lost its lease is dropped rather than recorded twice. Tasks are
+    keyed by content (e.g. the parse-cache key), so enqueueing is idempotent and
+    finished results are reused across runs.
+
+    Workers on several machines can share the file on a volume whose locking
+    SQLite supports; NFS-style mounts without reliable locks are not safe.
+    """
+
+    def __init__(self, path: str = WORK_QUEUE_PATH, lease_seconds: float = 120.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # Writers wait for each other instead of failing with "database is locked"
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def _write(self, fn):
+        # BEGIN IMMEDIATE takes the write lock up front so claims never interleave
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue_many(self, kind: str, tasks: Iterable[Tuple[str, dict]]) -> int:
+        """
+        Add (key, payload) tasks; existing keys are kept, failed ones (and done ones
+        whose result is an error dict) are retried. Returns rows touched.
+        """
+        now = time.time()
+        rows = [(key, kind, json.dumps(payload, default=str), now) for key, payload in tasks]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                """INSERT INTO tasks (key, kind, payload, updated_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET
+                       status = 'pending', attempts = 0, error = NULL, payload = excluded.payload,
+                       updated_at = excluded.updated_at
+                   WHERE tasks.status = 'failed'
+                      OR (tasks.status = 'done' AND json_extract(tasks.result, '$.error') IS NOT NULL)""",
+                rows,
+            )
+            return conn.total_changes - before
+
+        return self._write(insert)
+
+    def claim(self, worker_id: str, kinds: Iterable[str], limit: int = 1) -> List[dict]:
+        """Lease up to `limit` runnable tasks of the given kinds to worker_id."""
+        kinds = list(kinds)
+        marks = ",".join("?" * len(kinds))
+
+        def take(conn):
+            now = time.time()
+            # Expired leases that already used every attempt are given up on
+            conn.execute(
+                f"""UPDATE tasks SET status = 'failed', error = COALESCE(error, 'lease expired'), lease_owner = NULL, updated_at = ?
+                    WHERE kind IN ({marks}) AND status = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                (now, *kinds, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                f"""SELECT id, key, kind, payload, attempts FROM tasks
+                    WHERE kind IN ({marks})
+                      AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?))
+                    ORDER BY id LIMIT ?""",
+                (*kinds, now, limit),
+            ).fetchall()
+            conn.executemany(
+                """UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                       attempts = attempts + 1, updated_at = ?
+                   WHERE id = ?""",
+                [(worker_id, now + self.lease_seconds, now, row[0]) for row in rows],
+            )
+            return [
+                {"id": row[0], "key": row[1], "kind": row[2], "payload": json.loads(row[3]), "attempt": row[4] + 1}
+                for row in rows
+            ]
+
+        return self._write(take)
+
+    def heartbeat(self, worker_id: str, task_ids: Iterable[int]) -> int:
+        """Extend the leases worker_id still holds; returns how many were extended."""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return 0
+        now = time.time()
+
+        def extend(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                [(now + self.lease_seconds, now, task_id, worker_id) for task_id in task_ids],
+            )
+            return conn.total_changes - before
+
+        return self._write(extend)
+
+    def complete(self, worker_id: str, task_id: int, result) -> bool:
+        """Record a result; False if the lease was lost and someone else owns the task now."""
+
+        def finish(conn):
+            cursor = conn.execute(
+                """UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_owner = NULL, updated_at = ?
+                   WHERE id = ? AND lease_owner = ? AND status = 'leased'""",
+                (json.dumps(result, default=str), time.time(), task_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+        return self._write(finish)
+
+    def fail(self, worker_id: str, task_id: int, error: str) -> bool:
+        """Release a task after an error: back to pending, or failed once attempts run out."""
+
+        def release(conn):
+            cursor = conn.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                       error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                   WHERE id = ? AND lease_owner = ? AND status = 'leased'""",
+                (self.max_attempts, error, time.time(), task_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+        return self._write(release)
+
+    def statuses(self, keys: List[str], chunk_size: int = 500) -> Dict[str, str]:
+        found = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            with self._lock:
+                found.update(self._conn.execute(
+                    f"SELECT key, status FROM tasks WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return found
+
+    def results(self, keys: List[str], chunk_size: int = 500) -> Dict[str, dict]:
+        """Map each finished key to {"status", "result", "error"}."""
+        found = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, status, result, error FROM tasks WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            for key, status, result, error in rows:
+                found[key] = {"status": status, "result": json.loads(result) if result else None, "error": error}
+        return found
+
+    def wait_for(
+        self,
+        keys: List[str],
+        poll_interval: float = 1.0,
+        timeout: Optional[float] = None,
+        progress=None,
+        alive=None,
+    ) -> bool:
+        """
+        Block until every key is done or failed.
+
+        Args:
+            keys (list): Task keys to wait for.
+            poll_interval (float): Seconds between status checks.
+            timeout (float, optional): Give up after this many seconds.
+            progress (callable, optional): Called with the number of finished tasks.
+            alive (callable, optional): Returns False once no worker is left to run the
+                tasks; waiting stops then.
+
+        Returns:
+            bool: True if everything finished, False on timeout or once alive() is False.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            statuses = self.statuses(keys)
+            finished = sum(1 for key in keys if statuses.get(key) in (DONE, FAILED))
+            if progress is not None:
+                progress(finished)
+            if finished == len(keys):
+                return True
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            if alive is not None and not alive():
+                return False
+            time.sleep(poll_interval)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    def close(self):
+        self._conn.close()
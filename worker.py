@@ -0,0 +1,179 @@
+"""
+Queue worker: claims parse/triage/analyze tasks from the shared work queue and runs them.
+
+Start as many as the LLM hosts can keep busy, on this box or any other that
+mounts the same output directory:
+
+    python worker.py --config batch.json
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis_cache import AnalysisCache
+from main import make_backend, DEFAULT_MODEL
+from metrics import RunMetrics
+from parse_cache import ParseCache
+from work_queue import WorkQueue, WORK_QUEUE_PATH
+
+TASK_KINDS = ("parse", "triage", "analyze")
+
+
+class QueueWorker:
+    """
+    Runs claimed tasks on a thread pool while a heartbeat thread keeps their leases.
+
+    Each task's result goes through the same parse/analysis caches as a
+    single-process run, so a task redone after a lost lease costs no LLM call.
+    """
+
+    def __init__(self, queue: WorkQueue, llm, worker_id: str = None, concurrency: int = 4):
+        self.queue = queue
+        self.llm = llm
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency)
+        self.parse_cache = ParseCache()
+        self.analysis_cache = AnalysisCache()
+        self._held = set()
+        self._held_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._loaded = set()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            with self._held_lock:
+                held = list(self._held)
+            try:
+                self.queue.heartbeat(self.worker_id, held)
+            except Exception as e:
+                print(f"⚠️ Heartbeat failed: {e}")
+
+    def _run_parse(self, payload: dict) -> dict:
+        parsed = self.parse_cache.get(payload["cache_key"])
+        if parsed is None:
+            parsed = self.llm.parse_resume(payload["pdf_path"])
+            self.parse_cache.put(payload["cache_key"], parsed)
+        return parsed
+
+    def _run_analyze(self, payload: dict) -> dict:
+        result = self.analysis_cache.get(payload["cache_key"])
+        if result is None:
+            result = self.llm.analyze_resume_against_job(
+                resume_data=payload["parsed_resume"],
+                candidate_meta=payload["candidate"],
+                job_description=payload["job_description"],
+            )
+            self.analysis_cache.put(payload["cache_key"], result)
+        return result
+
+    def _run_triage(self, payload: dict) -> dict:
+        result = self.analysis_cache.get(payload["cache_key"])
+        if result is None:
+            result = self.llm.triage_resume(payload["parsed_resume"], payload["job_description"])
+            self.analysis_cache.put(payload["cache_key"], result)
+        return result
+
+    def _run(self, task: dict):
+        handlers = {"parse": self._run_parse, "triage": self._run_triage, "analyze": self._run_analyze}
+        try:
+            result = handlers[task["kind"]](task["payload"])
+            if isinstance(result, dict) and "error" in result:
+                # Same rule as the caches: a failed model call is retried, never recorded as done
+                raise ValueError(result["error"])
+            if not self.queue.complete(self.worker_id, task["id"], result):
+                print(f"⚠️ Lease on {task['key']} was lost; result discarded.")
+        except Exception as e:
+            print(f"❌ Task {task['key']} failed (attempt {task['attempt']}): {e}")
+            self.queue.fail(self.worker_id, task["id"], repr(e))
+        finally:
+            with self._held_lock:
+                self._held.discard(task["id"])
+
+    def _preload(self, kind: str):
+        # Load each phase's model once, the first time this worker sees that kind of task;
+        # a failed load is tried again with the next claim
+        if kind in self._loaded:
+            return
+        models = {"parse": self.llm.parse_model, "triage": self.llm.triage_model, "analyze": self.llm.model}
+        if self.llm.preload(models[kind]):
+            self._loaded.add(kind)
+
+    def run(self, kinds=TASK_KINDS, idle_exit: float = None, poll_interval: float = 1.0) -> int:
+        """
+        Claim and run tasks until stopped, or until idle for idle_exit seconds.
+
+        Returns:
+            int: Number of tasks this worker ran.
+        """
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        ran = 0
+        idle_since = time.monotonic()
+        print(f"👷 Worker {self.worker_id} polling {self.queue.path} for {', '.join(kinds)} tasks.")
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                while not self._stop.is_set():
+                    with self._held_lock:
+                        free = self.concurrency - len(self._held)
+                    tasks = self.queue.claim(self.worker_id, kinds, limit=free) if free > 0 else []
+                    if not tasks:
+                        if idle_exit is not None and not self._held and time.monotonic() - idle_since > idle_exit:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+                    idle_since = time.monotonic()
+                    # Heartbeat the leases right away; a cold model load can outlast lease_seconds
+                    with self._held_lock:
+                        self._held.update(task["id"] for task in tasks)
+                    # One load attempt per kind and claim; tasks run (and retry) either way
+                    for kind in dict.fromkeys(task["kind"] for task in tasks):
+                        self._preload(kind)
+                    for task in tasks:
+                        pool.submit(self._run, task)
+                        ran += 1
+        finally:
+            self._stop.set()
+        return ran
+
+    def stop(self):
+        self._stop.set()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run parse/triage/analyze tasks from the shared work queue.")
+    parser.add_argument("--config", required=True, help="Batch JSON config (model, hosts, queue_path, ...)")
+    parser.add_argument("--kinds", default=",".join(TASK_KINDS), help="Comma-separated task kinds to take")
+    parser.add_argument("--concurrency", type=int, default=None, help="Tasks run at once (default: config worker_concurrency or 4)")
+    parser.add_argument("--idle-exit", type=float, default=None, help="Exit after this many idle seconds")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with open(args.config, "r") as f:
+        config = json.load(f)
+    metrics = RunMetrics()
+    queue = WorkQueue(
+        config.get("queue_path", WORK_QUEUE_PATH),
+        lease_seconds=config.get("lease_seconds", 120),
+        max_attempts=config.get("max_attempts", 3),
+    )
+    llm_backend = make_backend(config.get("model", DEFAULT_MODEL), config, metrics)
+    worker = QueueWorker(
+        queue,
+        llm_backend,
+        concurrency=args.concurrency or config.get("worker_concurrency", 4),
+    )
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    try:
+        ran = worker.run(kinds, idle_exit=args.idle_exit)
+        print(f"👷 Worker {worker.worker_id} finished after {ran} task(s).")
+    except KeyboardInterrupt:
+        worker.stop()
+    metrics.export(os.path.join("output", "workers", worker.worker_id))
+    llm_backend.close()